@@ -53,9 +53,14 @@ class TenantContext:
     created_at: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
     
-    def update_activity(self) -> None:
-        """Actualiza el timestamp de última actividad."""
-        self.last_activity = datetime.now()
+    def update_activity(self, now: Optional[datetime] = None) -> None:
+        """
+        Actualiza el timestamp de última actividad.
+        
+        Args:
+            now: Momento de la actividad (por defecto, la hora actual)
+        """
+        self.last_activity = now if now is not None else datetime.now()
     
     def get_active_servers(self) -> List[ManagedServer]:
         """
@@ -236,8 +241,9 @@ class MultitenantManager:
         Raises:
             TenantNotFoundError: Si el tenant no existe en el Registry
         """
-        if tenant_id in self.tenants:
-            context = self.tenants[tenant_id]
+        # Camino caliente: una sola búsqueda cuando el contexto ya existe
+        context = self.tenants.get(tenant_id)
+        if context is not None:
             context.update_activity()
             return context
         
@@ -246,14 +252,16 @@ class MultitenantManager:
         if not config:
             raise TenantNotFoundError(f"Tenant no encontrado: {tenant_id}")
         
-        # Crear contexto del tenant
-        context = TenantContext(
+        # Crear contexto del tenant; setdefault conserva el primero
+        # registrado si otra ruta lo creó entretanto
+        created = TenantContext(
             tenant_id=tenant_id,
             config=config
         )
         
-        self.tenants[tenant_id] = context
-        logger.info(f"Contexto de tenant creado: {tenant_id}")
+        context = self.tenants.setdefault(tenant_id, created)
+        if context is created:
+            logger.info(f"Contexto de tenant creado: {tenant_id}")
         
         return context
     
@@ -21,11 +21,15 @@ Autor: Ainsophic Team
 import asyncio
 import logging
 import signal
-from typing import Dict, List, Optional, Callable, Any
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
 
+import orjson
+
 from mcp_hub.core.registry import ServerConfig, Registry
 from mcp_hub.transport.stdio_client import (
     StdioClientWrapper,
@@ -75,6 +79,8 @@ class ManagedServer:
     started_at: Optional[datetime] = None
     last_error: Optional[str] = None
     restart_count: int = 0
+    _status_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _status_bytes: bytes = field(default=b"", init=False, repr=False, compare=False)
     
     def is_running(self) -> bool:
         """
@@ -130,15 +136,28 @@ class Orchestrator:
         self._monitoring_task: Optional[asyncio.Task] = None
         self._shutdown_event = asyncio.Event()
         
+        # IDs internados de servidores gestionados: (tenant_id, server_name) -> ID
+        self._server_ids: Dict[Tuple[str, str], str] = {}
+        
+        # Un lock por servidor para serializar arranques concurrentes
+        self._start_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Instantánea serializada del estado de todos los servidores
+        self._status_snapshot: bytes = b""
+        self._status_dirty = True
+        
         # Configuración de reconexión
         self.max_retries = registry.orchestrator.max_retries
         self.startup_timeout = registry.orchestrator.startup_timeout
         
         logger.info("Orchestrator inicializado")
     
-    def _generate_server_id(self, tenant_id: str, server_name: str) -> str:
+    def server_id(self, tenant_id: str, server_name: str) -> str:
         """
-        Genera un ID único para un servidor.
+        Retorna el ID de un servidor a partir de su tenant y nombre.
+        
+        Para servidores ya gestionados retorna el ID internado, evitando
+        construir una cadena nueva en cada consulta.
         
         Args:
             tenant_id: ID del tenant
@@ -147,9 +166,34 @@ class Orchestrator:
         Returns:
             ID en formato "tenant_id:server_name"
         """
-        return f"{tenant_id}:{server_name}"
+        server_id = self._server_ids.get((tenant_id, server_name))
+        if server_id is None:
+            server_id = f"{tenant_id}:{server_name}"
+        return server_id
+    
+    def _intern_server_id(self, tenant_id: str, server_name: str) -> str:
+        """
+        Registra y retorna el ID internado de un servidor gestionado.
+        
+        Solo se internan servidores presentes en el registry, de modo que
+        la tabla no crece con IDs arbitrarios recibidos por la API.
+        
+        Args:
+            tenant_id: ID del tenant
+            server_name: Nombre del servidor
+            
+        Returns:
+            ID internado en formato "tenant_id:server_name"
+        """
+        key = (tenant_id, server_name)
+        server_id = self._server_ids.get(key)
+        if server_id is None:
+            server_id = sys.intern(f"{tenant_id}:{server_name}")
+            self._server_ids[key] = server_id
+        return server_id
     
-    def _parse_server_id(self, server_id: str) -> tuple[str, str]:
+    @staticmethod
+    def _parse_server_id(server_id: str) -> tuple[str, str]:
         """
         Parsea un ID de servidor en tenant_id y server_name.
         
@@ -162,11 +206,11 @@ class Orchestrator:
         Raises:
             ValueError: Si el formato del ID es inválido
         """
-        if ":" not in server_id:
+        tenant_id, separator, server_name = server_id.partition(":")
+        if not separator:
             raise ValueError(f"Formato de ID inválido: {server_id}")
         
-        parts = server_id.split(":", 1)
-        return parts[0], parts[1]
+        return tenant_id, server_name
     
     def add_observer(self, callback: Callable) -> None:
         """
@@ -193,10 +237,15 @@ class Orchestrator:
         """
         Notifica a todos los observadores sobre un evento.
         
+        Todas las transiciones de estado pasan por aquí, por lo que
+        también marca como desactualizada la instantánea de estado.
+        
         Args:
             event: Tipo de evento
             data: Datos del evento
         """
+        self._status_dirty = True
+        
         for observer in self._observers:
             try:
                 observer(event, data)
@@ -207,6 +256,10 @@ class Orchestrator:
         """
         Inicia un servidor MCP específico.
         
+        Los arranques concurrentes del mismo servidor se serializan: solo
+        el primero lanza el subproceso y el resto recibe el servidor ya
+        iniciado.
+        
         Args:
             server_id: ID del servidor (formato: "tenant_id:server_name")
             
@@ -224,10 +277,44 @@ class Orchestrator:
         if server_config is None:
             raise ValueError(f"Servidor no encontrado en registry: {server_id}")
         
+        server_id = self._intern_server_id(tenant_id, server_name)
+        
         if server_id in self.managed_servers and self.managed_servers[server_id].is_running():
             logger.warning(f"Servidor ya está ejecutándose: {server_id}")
             return self.managed_servers[server_id]
         
+        async with self._start_locks[server_id]:
+            # Otra tarea pudo iniciarlo mientras se esperaba el lock
+            managed = self.managed_servers.get(server_id)
+            if managed is not None and managed.is_running():
+                logger.debug(f"Servidor iniciado por otra tarea: {server_id}")
+                return managed
+            
+            return await self._launch_server(server_id, tenant_id, server_config)
+    
+    async def _launch_server(
+        self,
+        server_id: str,
+        tenant_id: str,
+        server_config: ServerConfig
+    ) -> ManagedServer:
+        """
+        Lanza el subproceso de un servidor y establece la sesión MCP.
+        
+        Debe llamarse con el lock de arranque del servidor adquirido.
+        
+        Args:
+            server_id: ID del servidor
+            tenant_id: ID del tenant
+            server_config: Configuración del servidor
+            
+        Returns:
+            ManagedServer con el servidor iniciado
+            
+        Raises:
+            MCPConnectionError: Si falla la conexión al servidor
+            MCPInitializationError: Si falla la inicialización
+        """
         logger.info(f"Iniciando servidor: {server_id}")
         
         # Crear ManagedServer
@@ -245,7 +332,7 @@ class Orchestrator:
             # Crear y conectar cliente MCP
             client = StdioClientWrapper(
                 command=server_config.command,
-                args=server_config.args,
+                args=list(server_config.args),
                 timeout=self.startup_timeout,
                 max_retries=self.max_retries
             )
@@ -292,7 +379,7 @@ class Orchestrator:
         
         started_servers = []
         for server_config in tenant.get_enabled_servers():
-            server_id = self._generate_server_id(tenant_id, server_config.name)
+            server_id = self.server_id(tenant_id, server_config.name)
             try:
                 managed = await self.start_server(server_id)
                 started_servers.append(managed)
@@ -340,6 +427,10 @@ class Orchestrator:
             logger.error(f"Error deteniendo servidor {server_id}: {e}")
             managed.state = ServerState.CRASHED
             managed.last_error = str(e)
+            self._notify_observers("server_stop_failed", {
+                "server_id": server_id,
+                "error": str(e)
+            })
     
     async def stop_tenant_servers(self, tenant_id: str) -> None:
         """
@@ -399,6 +490,35 @@ class Orchestrator:
             "restart_count": managed.restart_count
         }
     
+    def get_server_status_bytes(self, server_id: str) -> Optional[bytes]:
+        """
+        Retorna el estado de un servidor serializado a JSON.
+        
+        La serialización se cachea en el ManagedServer y solo se rehace
+        cuando cambia alguno de los campos variables del estado.
+        
+        Args:
+            server_id: ID del servidor
+            
+        Returns:
+            JSON en bytes con el estado o None si no existe
+        """
+        managed = self.managed_servers.get(server_id)
+        if managed is None:
+            return None
+        
+        status_key = (
+            managed.state,
+            managed.started_at,
+            managed.last_error,
+            managed.restart_count
+        )
+        if managed._status_key != status_key:
+            managed._status_bytes = orjson.dumps(self.get_server_status(server_id))
+            managed._status_key = status_key
+        
+        return managed._status_bytes
+    
     def get_all_servers_status(self) -> Dict[str, Dict[str, Any]]:
         """
         Retorna el estado de todos los servidores gestionados.
@@ -412,6 +532,34 @@ class Orchestrator:
             if self.get_server_status(server_id) is not None
         }
     
+    def _refresh_status_snapshot(self) -> None:
+        """
+        Recalcula y serializa la instantánea del estado de los servidores.
+        """
+        self._status_dirty = False
+        servers_status = self.get_all_servers_status()
+        self._status_snapshot = orjson.dumps({
+            "servers": servers_status,
+            "total": len(servers_status)
+        })
+    
+    @property
+    def status_snapshot(self) -> bytes:
+        """
+        Retorna el estado de todos los servidores serializado a JSON.
+        
+        Toda transición de estado pasa por _notify_observers, que marca
+        la instantánea como desactualizada; se recalcula en la primera
+        consulta posterior y, mientras no haya transiciones, las
+        consultas reutilizan los mismos bytes.
+        
+        Returns:
+            JSON en bytes con las llaves "servers" y "total"
+        """
+        if self._status_dirty:
+            self._refresh_status_snapshot()
+        return self._status_snapshot
+    
     def get_server_client(self, server_id: str) -> Optional[StdioClientWrapper]:
         """
         Retorna el cliente MCP de un servidor específico.
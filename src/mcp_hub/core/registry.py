@@ -14,19 +14,24 @@ Patrones de Diseño Utilizados:
 Autor: Ainsophic Team
 """
 
-import json
+import contextlib
+import copy
 import os
+import sys
 import logging
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import orjson
+
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServerConfig:
     """
     Configuración de un servidor MCP.
@@ -35,20 +40,24 @@ class ServerConfig:
         name: Nombre único del servidor
         type: Tipo de servidor (database, api, file, etc.)
         command: Comando para iniciar el servidor
-        args: Argumentos del comando
+        args: Argumentos del comando (tupla inmutable)
         enabled: Indica si el servidor está habilitado
-        capabilities: Lista de capacidades (tools, resources, prompts)
+        capabilities: Capacidades del servidor (tools, resources, prompts)
         transport: Tipo de transporte (stdio, http, sse)
         metadata: Metadatos adicionales del servidor
+    
+    La configuración es inmutable una vez cargada; los cambios se
+    aplican recargando el archivo. Los metadatos se excluyen del hash
+    (un dict no es hasheable), pero siguen contando en la igualdad.
     """
     name: str
     type: str
     command: str
-    args: List[str] = field(default_factory=list)
+    args: Tuple[str, ...] = ()
     enabled: bool = True
-    capabilities: List[str] = field(default_factory=list)
+    capabilities: Tuple[str, ...] = ()
     transport: str = "stdio"
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict, hash=False)
     
     def get_full_command(self) -> List[str]:
         """
@@ -57,10 +66,10 @@ class ServerConfig:
         Returns:
             Lista con el comando y sus argumentos
         """
-        return [self.command] + self.args
+        return [self.command, *self.args]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TenantConfig:
     """
     Configuración de un tenant (inquilino).
@@ -69,22 +78,42 @@ class TenantConfig:
         tenant_id: Identificador único del tenant
         description: Descripción del tenant
         servers: Diccionario de servidores configurados
+        enabled_servers: Servidores habilitados, calculados al construir
+    
+    El hash se calcula sobre tenant_id y description; el diccionario de
+    servidores solo participa en la igualdad.
     """
     tenant_id: str
     description: str = ""
-    servers: Dict[str, ServerConfig] = field(default_factory=dict)
+    servers: Dict[str, ServerConfig] = field(default_factory=dict, hash=False)
+    enabled_servers: Tuple[ServerConfig, ...] = field(
+        init=False, repr=False, compare=False
+    )
     
-    def get_enabled_servers(self) -> List[ServerConfig]:
+    def __post_init__(self) -> None:
         """
-        Retorna la lista de servidores habilitados.
+        Precalcula los servidores habilitados.
+        
+        La configuración es inmutable, por lo que el resultado no cambia
+        durante la vida de la instancia.
+        """
+        object.__setattr__(
+            self,
+            "enabled_servers",
+            tuple(server for server in self.servers.values() if server.enabled)
+        )
+    
+    def get_enabled_servers(self) -> Tuple[ServerConfig, ...]:
+        """
+        Retorna los servidores habilitados.
         
         Returns:
-            Lista de servidores configurados como enabled=True
+            Tupla de servidores configurados como enabled=True
         """
-        return [server for server in self.servers.values() if server.enabled]
+        return self.enabled_servers
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GatewayConfig:
     """
     Configuración del gateway HTTP/WebSocket.
@@ -101,7 +130,7 @@ class GatewayConfig:
     host: str = "0.0.0.0"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     """
     Configuración de logging.
@@ -114,7 +143,7 @@ class LoggingConfig:
     format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OrchestratorConfig:
     """
     Configuración del orchestrator.
@@ -186,6 +215,55 @@ class Registry:
         instance._load_from_file(config_path)
         return instance
     
+    @classmethod
+    def load_from_dict(cls, data: Dict[str, Any], source: Optional[str] = None) -> "Registry":
+        """
+        Carga la configuración desde un diccionario en memoria.
+        
+        Evita el acceso a disco cuando la configuración ya está
+        disponible (p. ej. en tests). Sin archivo asociado, reload()
+        no está disponible.
+        
+        Args:
+            data: Diccionario con la misma estructura que el archivo JSON
+            source: Descripción del origen de los datos (para los logs)
+            
+        Returns:
+            Instancia del Registry con la configuración cargada
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        
+        instance = cls._instance
+        instance._config_path = None
+        instance._last_modified = None
+        instance._apply_config(data, source=source or "diccionario en memoria")
+        return instance
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _load_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+        """
+        Lee y parsea un archivo de configuración, memoizando el resultado.
+        
+        La clave incluye mtime y tamaño del archivo, de modo que una
+        modificación invalida la entrada. El diccionario retornado es
+        compartido: los parsers copian sus valores mutables.
+        
+        Args:
+            path: Ruta absoluta al archivo de configuración
+            mtime_ns: Fecha de modificación del archivo en nanosegundos
+            size: Tamaño del archivo en bytes
+            
+        Returns:
+            Diccionario con la configuración parseada
+            
+        Raises:
+            json.JSONDecodeError: Si el JSON no es válido (orjson.JSONDecodeError
+                es subclase de json.JSONDecodeError)
+        """
+        return orjson.loads(Path(path).read_bytes())
+    
     @classmethod
     def get_instance(cls) -> "Registry":
         """
@@ -201,6 +279,26 @@ class Registry:
             raise RuntimeError("Registry no inicializado. Usar Registry.load() primero.")
         return cls._instance
     
+    @classmethod
+    @contextlib.contextmanager
+    def isolated(cls) -> Iterator[None]:
+        """
+        Aísla el singleton del Registry durante un bloque.
+        
+        Dentro del bloque no hay instancia cargada; al salir se restaura
+        la instancia previa, aunque el bloque haya fallado.
+        
+        Ejemplo de uso:
+            >>> with Registry.isolated():
+            ...     registry = Registry.load("config/servers.json")
+        """
+        saved = cls._instance
+        cls._instance = None
+        try:
+            yield
+        finally:
+            cls._instance = saved
+    
     def _load_from_file(self, config_path: str) -> None:
         """
         Carga la configuración desde el archivo JSON especificado.
@@ -217,22 +315,33 @@ class Registry:
         if not path.exists():
             raise FileNotFoundError(f"Archivo de configuración no encontrado: {config_path}")
         
-        # Cargar JSON del archivo
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Cargar JSON del archivo (memoizado por ruta, mtime y tamaño)
+        stat_result = path.stat()
+        data = self._load_cached(
+            os.path.abspath(path), stat_result.st_mtime_ns, stat_result.st_size
+        )
         
         # Guardar información del archivo
         self._config_path = path
-        self._last_modified = datetime.fromtimestamp(path.stat().st_mtime)
+        self._last_modified = datetime.fromtimestamp(stat_result.st_mtime)
         
-        # Parsear configuración
+        self._apply_config(data, source=config_path)
+    
+    def _apply_config(self, data: Dict[str, Any], source: str) -> None:
+        """
+        Construye la configuración a partir de un diccionario ya parseado.
+        
+        Args:
+            data: Diccionario con la configuración
+            source: Origen de la configuración (para los logs)
+        """
         self.version = data.get("version", "0.1.0")
         self._parse_tenants(data.get("tenants", {}))
         self._parse_gateway(data.get("gateway", {}))
         self._parse_logging(data.get("logging", {}))
         self._parse_orchestrator(data.get("orchestrator", {}))
         
-        logger.info(f"Configuración cargada exitosamente desde {config_path}")
+        logger.info(f"Configuración cargada exitosamente desde {source}")
         logger.info(f"Tenants cargados: {list(self.tenants.keys())}")
     
     def _parse_tenants(self, tenants_data: Dict[str, Any]) -> None:
@@ -245,19 +354,22 @@ class Registry:
         self.tenants.clear()
         
         for tenant_id, tenant_info in tenants_data.items():
+            tenant_id = sys.intern(tenant_id)
             servers = {}
             
             for server_name, server_info in tenant_info.get("servers", {}).items():
+                server_name = sys.intern(server_name)
+                
                 # Crear configuración del servidor
                 server_config = ServerConfig(
                     name=server_name,
                     type=server_info.get("type", "unknown"),
                     command=server_info["command"],
-                    args=server_info.get("args", []),
+                    args=tuple(server_info.get("args", ())),
                     enabled=server_info.get("enabled", True),
-                    capabilities=server_info.get("capabilities", []),
+                    capabilities=tuple(server_info.get("capabilities", ())),
                     transport=server_info.get("transport", "stdio"),
-                    metadata=server_info.get("metadata", {})
+                    metadata=copy.deepcopy(server_info.get("metadata", {}))
                 )
                 servers[server_name] = server_config
             
@@ -372,6 +484,9 @@ class Registry:
         if self._config_path is None:
             raise RuntimeError("No hay archivo de configuración cargado.")
         
+        # Forzar la relectura aunque el mtime no haya avanzado
+        # (resolución gruesa del sistema de archivos)
+        self._load_cached.cache_clear()
         self._load_from_file(str(self._config_path))
         logger.info("Configuración recargada exitosamente")
     
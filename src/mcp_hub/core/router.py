@@ -106,6 +106,9 @@ class DynamicToolRouter:
         self.tools: Dict[str, ToolRegistration] = {}
         self._tool_handlers: Dict[str, Callable] = {}
         
+        # Versión del catálogo; se incrementa en cada descubrimiento o limpieza
+        self.version = 0
+        
         logger.info("DynamicToolRouter inicializado")
     
     def _generate_prefixed_name(self, server_id: str, tool_name: str) -> str:
@@ -200,6 +203,7 @@ class DynamicToolRouter:
                     f"(orig: {tool.name}, servidor: {server_id})"
                 )
             
+            self.version += 1
             logger.info(f"Herramientas descubiertas para {server_id}: {len(discovered)}")
             return discovered
             
@@ -414,6 +418,8 @@ class DynamicToolRouter:
         else:
             self.tools.clear()
             logger.info("Todas las herramientas limpiadas")
+        
+        self.version += 1
     
     async def refresh_tools(self, server_id: str) -> List[ToolRegistration]:
         """
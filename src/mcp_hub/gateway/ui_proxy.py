@@ -19,13 +19,16 @@ Autor: Ainsophic Team
 
 import os
 import logging
+import zlib
 from typing import Optional, Dict, Any
 from pathlib import Path
 from fastapi import Request, Response
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse
 import aiofiles
 import mimetypes
 
+from mcp_hub.responses import ORJSONResponse
+
 
 logger = logging.getLogger(__name__)
 
@@ -81,8 +84,13 @@ class UIProxy:
         """
         self.plugins_dir = Path(plugins_dir)
         self.cache_enabled = cache_enabled
+        # Plantillas index.html por app (independientes del tenant) y la
+        # firma del archivo del que se leyeron
         self._cache: Dict[str, bytes] = {}
-        self._cache_etags: Dict[str, str] = {}
+        self._cache_sources: Dict[str, str] = {}
+        
+        # MIME type memoizado por extensión
+        self._mime_types: Dict[str, str] = {}
         
         # Crear directorio de plugins si no existe
         self.plugins_dir.mkdir(exist_ok=True)
@@ -130,6 +138,43 @@ class UIProxy:
         
         return ui_dir
     
+    def has_app(self, app_id: str) -> bool:
+        """
+        Indica si existe una aplicación, sin lanzar excepciones.
+        
+        Args:
+            app_id: ID de la aplicación
+            
+        Returns:
+            True si existe el directorio de la aplicación
+        """
+        return (self.plugins_dir / app_id).exists()
+    
+    def find_resource(self, app_id: str, resource_path: str) -> Optional[Path]:
+        """
+        Busca un recurso de una aplicación, sin lanzar excepciones.
+        
+        Permite a los endpoints responder 404 para recursos inexistentes
+        (el caso habitual) sin construir ni capturar una excepción.
+        
+        Args:
+            app_id: ID de la aplicación
+            resource_path: Ruta relativa del recurso
+            
+        Returns:
+            Path completo del recurso o None si no existe o no es un archivo
+        """
+        # Eliminar slash inicial si existe
+        if resource_path.startswith("/"):
+            resource_path = resource_path[1:]
+        
+        resource_file = self.plugins_dir / app_id / "ui" / resource_path
+        
+        if not resource_file.is_file():
+            return None
+        
+        return resource_file
+    
     def _get_resource_path(self, app_id: str, resource_path: str) -> Path:
         """
         Retorna la ruta completa de un recurso.
@@ -144,22 +189,13 @@ class UIProxy:
         Raises:
             ResourceNotFoundError: Si no se encuentra el recurso
         """
-        ui_dir = self._get_ui_dir(app_id)
-        
-        # Eliminar slash inicial si existe
-        if resource_path.startswith("/"):
-            resource_path = resource_path[1:]
-        
-        resource_file = ui_dir / resource_path
-        
-        if not resource_file.exists():
-            raise ResourceNotFoundError(
-                f"Recurso no encontrado: {app_id}/{resource_path}"
-            )
+        resource_file = self.find_resource(app_id, resource_path)
         
-        if not resource_file.is_file():
+        if resource_file is None:
+            # Resolver el directorio UI para reportar el error concreto
+            self._get_ui_dir(app_id)
             raise ResourceNotFoundError(
-                f"Ruta no es un archivo: {app_id}/{resource_path}"
+                f"Recurso no encontrado: {app_id}/{resource_path.lstrip('/')}"
             )
         
         return resource_file
@@ -168,8 +204,35 @@ class UIProxy:
         """
         Determina el MIME type de un archivo.
         
+        El resultado se memoiza por extensión, salvo para extensiones de
+        codificación (.gz, .br...) cuyo tipo depende del resto del nombre.
+        
+        Args:
+            file_path: Path del archivo
+            
+        Returns:
+            MIME type del archivo
+        """
+        ext = file_path.suffix.lower()
+        
+        mime_type = self._mime_types.get(ext)
+        if mime_type is not None:
+            return mime_type
+        
+        mime_type = self._guess_mime_type(file_path, ext)
+        
+        if ext not in mimetypes.encodings_map:
+            self._mime_types[ext] = mime_type
+        
+        return mime_type
+    
+    def _guess_mime_type(self, file_path: Path, ext: str) -> str:
+        """
+        Calcula el MIME type de un archivo sin usar la memoización.
+        
         Args:
             file_path: Path del archivo
+            ext: Extensión del archivo en minúsculas
             
         Returns:
             MIME type del archivo
@@ -180,7 +243,6 @@ class UIProxy:
             return mime_type
         
         # Fallback para extensiones comunes
-        ext = file_path.suffix.lower()
         mime_map = {
             '.html': 'text/html',
             '.css': 'text/css',
@@ -220,6 +282,18 @@ class UIProxy:
         
         return f'"{hasher.hexdigest()}"'
     
+    def _generate_stat_etag(self, stat_result: os.stat_result) -> str:
+        """
+        Genera un ETag a partir de los metadatos de un archivo.
+        
+        Args:
+            stat_result: Resultado de stat() del archivo
+            
+        Returns:
+            String ETag basado en fecha de modificación y tamaño
+        """
+        return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    
     def _check_cache_headers(
         self,
         request: Request,
@@ -325,7 +399,8 @@ class UIProxy:
         self,
         app_id: str,
         resource_path: str,
-        request: Optional[Request] = None
+        request: Optional[Request] = None,
+        file_path: Optional[Path] = None
     ) -> Response:
         """
         Sirve un recurso estático de una aplicación.
@@ -334,6 +409,7 @@ class UIProxy:
             app_id: ID de la aplicación
             resource_path: Ruta relativa del recurso
             request: Request HTTP (opcional, para cache headers)
+            file_path: Ruta ya resuelta con find_resource (opcional)
             
         Returns:
             Response con el recurso
@@ -341,51 +417,56 @@ class UIProxy:
         Raises:
             ResourceNotFoundError: Si no se encuentra el recurso
         """
-        file_path = self._get_resource_path(app_id, resource_path)
-        file_key = f"{app_id}:{resource_path}"
-        
-        # Leer contenido
-        content = await self._read_file(file_path)
+        if file_path is None:
+            file_path = self._get_resource_path(app_id, resource_path)
         
-        # Determinar MIME type
-        mime_type = self._get_mime_type(file_path)
-        
-        # Generar ETag
-        etag = self._generate_etag(content, file_path)
+        # El ETag se deriva de los metadatos para no leer el archivo
+        stat_result = file_path.stat()
+        etag = self._generate_stat_etag(stat_result)
         
         # Verificar caché del cliente
         if request and self._check_cache_headers(
             request,
             etag,
-            file_path.stat().st_mtime
+            stat_result.st_mtime
         ):
             return Response(status_code=304, headers={"ETag": etag})
         
         # Crear headers
         headers = {
             "ETag": etag,
-            "Cache-Control": "public, max-age=3600",
-            "Content-Type": mime_type
+            "Cache-Control": "public, max-age=3600"
         }
         
-        # Retornar respuesta
-        return Response(content=content, headers=headers)
+        # Retornar el archivo por streaming (sin cargarlo completo en memoria)
+        return FileResponse(
+            file_path,
+            media_type=self._get_mime_type(file_path),
+            headers=headers,
+            stat_result=stat_result
+        )
     
     async def serve_app_index(
         self,
         app_id: str,
         tenant_id: str,
         request: Optional[Request] = None,
-        additional_config: Optional[Dict[str, Any]] = None
+        additional_config: Optional[Dict[str, Any]] = None,
+        file_path: Optional[Path] = None
     ) -> HTMLResponse:
         """
         Sirve el index.html de una aplicación con configuración inyectada.
         
+        La plantilla se cachea una vez por app y se vuelve a leer cuando
+        cambia el archivo en disco; la configuración del tenant se inyecta
+        en cada request.
+        
         Args:
             app_id: ID de la aplicación
             tenant_id: ID del tenant
             request: Request HTTP (opcional)
             additional_config: Configuración adicional a inyectar
+            file_path: Ruta del index.html ya resuelta con find_resource (opcional)
             
         Returns:
             HTMLResponse con el index.html configurado
@@ -393,32 +474,39 @@ class UIProxy:
         Raises:
             ResourceNotFoundError: Si no se encuentra el index.html
         """
-        file_path = self._get_resource_path(app_id, "index.html")
+        if file_path is None:
+            file_path = self._get_resource_path(app_id, "index.html")
         file_key = f"{app_id}:index.html"
+        stat_result = file_path.stat()
+        source_tag = self._generate_stat_etag(stat_result)
         
-        # Leer contenido
-        content_bytes = await self._read_file(file_path)
-        content = content_bytes.decode("utf-8")
-        
-        # Inyectar configuración
-        content = self._inject_config(
-            content,
-            app_id,
-            tenant_id,
-            additional_config
-        )
-        
-        # Generar ETag
-        content_injected = content.encode("utf-8")
-        etag = self._generate_etag(content_injected, file_path)
-        
-        # Verificar caché del cliente
-        if request and self._check_cache_headers(
-            request,
-            etag,
-            file_path.stat().st_mtime
-        ):
-            return HTMLResponse(status_code=304, headers={"ETag": etag})
+        # La plantilla se cachea una vez por app: el tenant llega por query
+        # string y no debe poder crear entradas nuevas en la caché
+        if self.cache_enabled and self._cache_sources.get(file_key) == source_tag:
+            template = self._cache[file_key]
+        else:
+            template = await self._read_file(file_path)
+            if self.cache_enabled:
+                self._cache[file_key] = template
+                self._cache_sources[file_key] = source_tag
+        
+        if additional_config is None:
+            # El render depende solo del archivo y del tenant; el ETag se
+            # deriva de ambos sin necesidad de renderizar
+            etag = f'{source_tag[:-1]}-{zlib.crc32(tenant_id.encode()):x}"'
+            if request and self._check_cache_headers(request, etag, stat_result.st_mtime):
+                return HTMLResponse(status_code=304, headers={"ETag": etag})
+            
+            content_injected = self._inject_config(
+                template.decode("utf-8"), app_id, tenant_id
+            ).encode("utf-8")
+        else:
+            content_injected = self._inject_config(
+                template.decode("utf-8"), app_id, tenant_id, additional_config
+            ).encode("utf-8")
+            etag = self._generate_etag(content_injected, file_path)
+            if request and self._check_cache_headers(request, etag, stat_result.st_mtime):
+                return HTMLResponse(status_code=304, headers={"ETag": etag})
         
         # Retornar respuesta
         headers = {
@@ -426,14 +514,14 @@ class UIProxy:
             "Cache-Control": "no-cache",  # No cachear index.html configurado
         }
         
-        return HTMLResponse(content=content, headers=headers)
+        return HTMLResponse(content=content_injected, headers=headers)
     
-    async def list_apps(self) -> JSONResponse:
+    async def list_apps(self) -> ORJSONResponse:
         """
         Lista todas las aplicaciones disponibles.
         
         Returns:
-            JSONResponse con lista de aplicaciones
+            ORJSONResponse con lista de aplicaciones
         """
         apps = []
         
@@ -455,12 +543,12 @@ class UIProxy:
                         "has_ui": False
                     })
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "apps": apps,
             "total": len(apps)
         })
     
-    async def get_app_info(self, app_id: str) -> JSONResponse:
+    async def get_app_info(self, app_id: str) -> ORJSONResponse:
         """
         Retorna información detallada de una aplicación.
         
@@ -468,7 +556,7 @@ class UIProxy:
             app_id: ID de la aplicación
             
         Returns:
-            JSONResponse con información de la aplicación
+            ORJSONResponse con información de la aplicación
             
         Raises:
             ResourceNotFoundError: Si no se encuentra la aplicación
@@ -493,7 +581,7 @@ class UIProxy:
                 import json
                 metadata = json.loads(content)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "app_id": app_id,
             "has_ui": ui_dir.exists(),
             "ui_files": ui_files,
@@ -511,12 +599,11 @@ class UIProxy:
             keys_to_remove = [k for k in self._cache.keys() if k.startswith(f"{app_id}:")]
             for key in keys_to_remove:
                 del self._cache[key]
-                if key in self._cache_etags:
-                    del self._cache_etags[key]
+                self._cache_sources.pop(key, None)
             logger.info(f"Caché limpiada para app: {app_id}")
         else:
             self._cache.clear()
-            self._cache_etags.clear()
+            self._cache_sources.clear()
             logger.info("Toda la caché limpiada")
     
     def get_cache_stats(self) -> Dict[str, Any]:
@@ -17,25 +17,44 @@ Autor: Ainsophic Team
 """
 
 import asyncio
-import json
 import logging
-from typing import Dict, Optional, Any, Callable, Set
+from typing import Dict, List, Optional, Any, Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
-from enum import Enum, auto
+from enum import Enum
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from mcp_hub.responses import json_dumps
+
 
 logger = logging.getLogger(__name__)
 
 
+# Máximo de mensajes pendientes por conexión antes de cerrarla
+DEFAULT_OUTBOX_SIZE = 64
+
+# Máximo de frames pendientes que se agrupan en un único envío
+DEFAULT_MAX_BATCH = 32
+
+# Ventana de espera (segundos) para agrupar frames seguidos durante una ráfaga
+DEFAULT_BATCH_WINDOW = 0.001
+
+# Tamaño a partir del cual un lote se envía sin esperar más frames
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024
+
+# Tiempo máximo (segundos) para enviar los frames pendientes al cerrar
+DEFAULT_DRAIN_TIMEOUT = 1.0
+
+
 class MessageType(Enum):
     """
     Tipos de mensajes soportados por el gateway WebSocket.
     """
     TOOL_CALL = "tool_call"
+    TOOL_CALL_BATCH = "tool_call_batch"
     TOOL_RESULT = "tool_result"
+    TOOL_BATCH_RESULT = "tool_batch_result"
     TOOL_ERROR = "tool_error"
     APP_READY = "app_ready"
     APP_STATE = "app_state"
@@ -43,6 +62,42 @@ class MessageType(Enum):
     PING = "ping"
     PONG = "pong"
     ERROR = "error"
+    BATCH = "batch"
+
+
+def encode_frame(data: Dict[str, Any]) -> str:
+    """
+    Serializa datos a un frame de texto JSON usando orjson.
+    
+    Args:
+        data: Datos JSON-serializables
+        
+    Returns:
+        Frame JSON como string
+    """
+    return json_dumps(data).decode()
+
+
+def encode_batch(frames: List[str]) -> str:
+    """
+    Agrupa frames JSON ya serializados en un único frame BATCH.
+    
+    El cliente recibe {"type": "batch", "data": {"messages": [...]}}
+    y procesa cada mensaje de la lista en orden.
+    
+    Args:
+        frames: Frames JSON serializados
+        
+    Returns:
+        Frame BATCH serializado
+    """
+    return '{"type":"batch","data":{"messages":[' + ",".join(frames) + "]}}"
+
+
+# Tabla de lookup valor -> MessageType, evita la llamada a Enum() por frame
+_MESSAGE_TYPES: Dict[str, MessageType] = {
+    message_type.value: message_type for message_type in MessageType
+}
 
 
 @dataclass
@@ -75,6 +130,15 @@ class WebSocketMessage:
             "message_id": self.message_id
         }
     
+    def to_json(self) -> str:
+        """
+        Serializa el mensaje a un frame de texto JSON.
+        
+        Returns:
+            Frame JSON listo para enviar
+        """
+        return encode_frame(self.to_dict())
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "WebSocketMessage":
         """
@@ -85,12 +149,20 @@ class WebSocketMessage:
             
         Returns:
             Instancia de WebSocketMessage
+            
+        Raises:
+            ValueError: Si el tipo de mensaje no es válido
         """
-        message_type = MessageType(data.get("type"))
+        raw_type = data.get("type")
+        message_type = _MESSAGE_TYPES.get(raw_type)
+        if message_type is None:
+            raise ValueError(f"Tipo de mensaje inválido: {raw_type!r}")
+        
+        timestamp = data.get("timestamp")
         return cls(
             type=message_type,
             data=data.get("data", {}),
-            timestamp=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else datetime.now(),
             message_id=data.get("message_id")
         )
 
@@ -100,6 +172,14 @@ class AppConnection:
     """
     Representación de una conexión de MCP App.
     
+    Los mensajes salientes pasan por una cola acotada (outbox) que vacía
+    una tarea escritora dedicada. Si el cliente no consume a tiempo y la
+    cola se llena, la conexión se cierra en lugar de acumular memoria.
+    Si la App lo pidió en app_ready ({"batch": true}), cuando hay varios
+    frames pendientes, o llegan dentro de una ventana corta durante una
+    ráfaga, la tarea escritora los envía agrupados en un único frame BATCH; si no, cada
+    frame se envía por separado.
+    
     Atributos:
         connection_id: ID único de la conexión
         app_id: ID de la aplicación MCP
@@ -108,6 +188,12 @@ class AppConnection:
         connected_at: Timestamp de conexión
         last_activity: Última actividad
         state: Estado de la aplicación
+        batching: Si la App aceptó recibir frames agrupados en BATCH
+        closed: Si la conexión ya se cerró; los envíos posteriores se descartan
+        outbox_size: Máximo de mensajes pendientes de envío
+        max_batch: Máximo de frames agrupados en un envío
+        batch_window: Espera en segundos para agrupar frames seguidos
+        max_batch_bytes: Tamaño máximo aproximado de un lote en bytes
     """
     connection_id: str
     app_id: str
@@ -116,29 +202,175 @@ class AppConnection:
     connected_at: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
     state: Dict[str, Any] = field(default_factory=dict)
+    batching: bool = False
+    outbox_size: int = DEFAULT_OUTBOX_SIZE
+    max_batch: int = DEFAULT_MAX_BATCH
+    batch_window: float = DEFAULT_BATCH_WINDOW
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES
+    _send_text: Callable[[str], Awaitable[None]] = field(init=False, repr=False, compare=False)
+    _outbox: "asyncio.Queue[str]" = field(init=False, repr=False, compare=False)
+    _writer_task: Optional[asyncio.Task] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    closed: bool = field(default=False, init=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        """Pre-enlaza el método de envío del WebSocket y crea la cola de salida."""
+        self._send_text = self.websocket.send_text
+        self._outbox = asyncio.Queue(maxsize=self.outbox_size)
     
     def update_activity(self) -> None:
         """Actualiza el timestamp de última actividad."""
         self.last_activity = datetime.now()
     
+    def start_writer(self) -> None:
+        """
+        Inicia la tarea que envía los mensajes encolados por el WebSocket.
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+    
+    async def _writer_loop(self) -> None:
+        """
+        Loop de la tarea escritora: envía los mensajes en orden de llegada.
+        
+        Con batching activo recoge los frames pendientes (hasta max_batch
+        frames o max_batch_bytes) y los envía juntos en un frame BATCH.
+        Solo durante una ráfaga (el envío anterior ya agrupó varios
+        frames) espera batch_window a que lleguen más; una respuesta
+        aislada se envía sin demora.
+        """
+        burst = False
+        while True:
+            frames = [await self._outbox.get()]
+            try:
+                size = len(frames[0])
+                limit = self.max_batch if self.batching else 1
+                
+                if (
+                    burst and self.batching and self.batch_window > 0
+                    and size < self.max_batch_bytes and self._outbox.empty()
+                ):
+                    await asyncio.sleep(self.batch_window)
+                
+                while len(frames) < limit and size < self.max_batch_bytes:
+                    try:
+                        frame = self._outbox.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    frames.append(frame)
+                    size += len(frame)
+                
+                burst = len(frames) > 1
+                await self._send_text(frames[0] if len(frames) == 1 else encode_batch(frames))
+            except Exception as e:
+                logger.debug(f"Escritor detenido en conexión {self.connection_id}: {e}")
+                return
+            finally:
+                # También al cancelar durante la espera: cada get() tiene su task_done()
+                for _ in frames:
+                    self._outbox.task_done()
+    
+    async def stop_writer(self) -> None:
+        """
+        Detiene la tarea escritora descartando los mensajes pendientes.
+        """
+        task = self._writer_task
+        if task is None:
+            return
+        
+        self._writer_task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    async def flush(self) -> None:
+        """
+        Espera a que la tarea escritora envíe todos los mensajes encolados.
+        """
+        await self._outbox.join()
+    
+    async def drain(self, timeout: float = DEFAULT_DRAIN_TIMEOUT) -> None:
+        """
+        Intenta enviar los mensajes pendientes antes de cerrar la conexión.
+        
+        Si la tarea escritora ya terminó (p. ej. el socket se cerró) no
+        hay nada que esperar; si el cliente no consume a tiempo, se
+        abandona al vencer el timeout.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+        """
+        task = self._writer_task
+        if task is None or task.done():
+            return
+        
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.debug(
+                f"Timeout enviando mensajes pendientes en conexión {self.connection_id}"
+            )
+    
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Detiene la tarea escritora y cierra el WebSocket.
+        
+        Args:
+            code: Código de cierre WebSocket
+            reason: Motivo del cierre
+        """
+        self.closed = True
+        await self.stop_writer()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception as e:
+            logger.debug(f"Error cerrando conexión {self.connection_id}: {e}")
+    
     async def send_message(self, message: WebSocketMessage) -> None:
         """
-        Envía un mensaje a través del WebSocket.
+        Encola un mensaje para enviarlo a través del WebSocket.
         
         Args:
             message: Mensaje a enviar
         """
-        await self.websocket.send_json(message.to_dict())
-        self.update_activity()
+        await self.send_frame(message.to_json())
     
     async def send_data(self, data: Dict[str, Any]) -> None:
         """
-        Envía datos JSON a través del WebSocket.
+        Encola datos JSON para enviarlos a través del WebSocket.
         
         Args:
             data: Datos a enviar
         """
-        await self.websocket.send_json(data)
+        await self.send_frame(encode_frame(data))
+    
+    async def send_frame(self, frame: str) -> None:
+        """
+        Encola un frame JSON ya serializado.
+        
+        Permite compartir un mismo frame entre varias conexiones sin
+        volver a serializarlo. Si la cola de salida está llena el cliente
+        no está consumiendo a tiempo, y la conexión se cierra; una vez
+        cerrada, los frames siguientes se descartan.
+        
+        Args:
+            frame: Frame JSON serializado
+        """
+        if self.closed:
+            return
+        
+        try:
+            self._outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Cola de salida llena en conexión {self.connection_id}, cerrando"
+            )
+            await self.close(code=1013, reason="Cola de salida llena")
+            return
+        
         self.update_activity()
     
     async def send_error(self, error: str, details: Optional[Dict[str, Any]] = None) -> None:
@@ -184,7 +416,16 @@ class MCPAppGateway:
         >>> await gateway.handle_websocket(websocket, "myapp", "default")
     """
     
-    def __init__(self, orchestrator, router, multitenant_manager):
+    def __init__(
+        self,
+        orchestrator,
+        router,
+        multitenant_manager,
+        outbox_size: int = DEFAULT_OUTBOX_SIZE,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES
+    ):
         """
         Inicializa el gateway WebSocket.
         
@@ -192,17 +433,40 @@ class MCPAppGateway:
             orchestrator: Instancia del Orchestrator
             router: Instancia del Router dinámico
             multitenant_manager: Instancia del MultitenantManager
+            outbox_size: Máximo de mensajes pendientes por conexión
+            max_batch: Máximo de frames agrupados en un envío
+            batch_window: Espera en segundos para agrupar frames seguidos
+            max_batch_bytes: Tamaño máximo aproximado de un lote en bytes
         """
         self.orchestrator = orchestrator
         self.router = router
         self.multitenant_manager = multitenant_manager
+        self.outbox_size = outbox_size
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_batch_bytes = max_batch_bytes
         
         self.connections: Dict[str, AppConnection] = {}
         self._connection_counter = 0
         
+        # Índices secundarios: app_id/tenant_id -> {connection_id: conexión}
+        self._by_app: Dict[str, Dict[str, AppConnection]] = {}
+        self._by_tenant: Dict[str, Dict[str, AppConnection]] = {}
+        
         # Observadores de eventos
         self._event_observers: List[Callable] = []
         
+        # Tabla de despacho: tipo de mensaje -> handler
+        self._handlers: Dict[
+            MessageType,
+            Callable[[AppConnection, WebSocketMessage], Awaitable[None]]
+        ] = {
+            MessageType.TOOL_CALL: self._handle_tool_call,
+            MessageType.TOOL_CALL_BATCH: self._handle_tool_call_batch,
+            MessageType.APP_READY: self._handle_app_ready,
+            MessageType.PING: self._handle_ping,
+        }
+        
         logger.info("MCPAppGateway inicializado")
     
     def _generate_connection_id(self, app_id: str, tenant_id: str) -> str:
@@ -219,6 +483,34 @@ class MCPAppGateway:
         self._connection_counter += 1
         return f"{tenant_id}:{app_id}:{self._connection_counter}"
     
+    def _index_connection(self, connection: AppConnection) -> None:
+        """
+        Registra una conexión en los índices por app y por tenant.
+        
+        Args:
+            connection: Conexión a indexar
+        """
+        self._by_app.setdefault(connection.app_id, {})[connection.connection_id] = connection
+        self._by_tenant.setdefault(connection.tenant_id, {})[connection.connection_id] = connection
+    
+    def _unindex_connection(self, connection: AppConnection) -> None:
+        """
+        Elimina una conexión de los índices, descartando los buckets vacíos.
+        
+        Args:
+            connection: Conexión a eliminar de los índices
+        """
+        for index, key in (
+            (self._by_app, connection.app_id),
+            (self._by_tenant, connection.tenant_id),
+        ):
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(connection.connection_id, None)
+            if not bucket:
+                del index[key]
+    
     def add_event_observer(self, callback: Callable) -> None:
         """
         Registra un observador de eventos del gateway.
@@ -265,7 +557,7 @@ class MCPAppGateway:
         
         Este método:
         1. Acepta la conexión WebSocket
-        2. Crea un objeto AppConnection
+        2. Crea un objeto AppConnection y arranca su tarea escritora
         3. Inicia el loop de procesamiento de mensajes
         4. Maneja desconexiones
         
@@ -283,10 +575,16 @@ class MCPAppGateway:
             connection_id=connection_id,
             app_id=app_id,
             tenant_id=tenant_id,
-            websocket=websocket
+            websocket=websocket,
+            outbox_size=self.outbox_size,
+            max_batch=self.max_batch,
+            batch_window=self.batch_window,
+            max_batch_bytes=self.max_batch_bytes
         )
+        connection.start_writer()
         
         self.connections[connection_id] = connection
+        self._index_connection(connection)
         logger.info(f"Conexión WebSocket aceptada: {connection_id}")
         self._notify_observers("connection_opened", {
             "connection_id": connection_id,
@@ -356,18 +654,16 @@ class MCPAppGateway:
             connection: Conexión de la App
             message: Mensaje recibido
         """
+        handler = self._handlers.get(message.type)
+        
         try:
-            if message.type == MessageType.TOOL_CALL:
-                await self._handle_tool_call(connection, message)
-            elif message.type == MessageType.APP_READY:
-                await self._handle_app_ready(connection, message)
-            elif message.type == MessageType.PING:
-                await self._handle_ping(connection)
-            else:
+            if handler is None:
                 logger.warning(f"Tipo de mensaje desconocido: {message.type}")
                 await connection.send_error(
                     f"Tipo de mensaje desconocido: {message.type.value}"
                 )
+            else:
+                await handler(connection, message)
                 
         except Exception as e:
             logger.error(f"Error manejando mensaje: {e}")
@@ -423,6 +719,67 @@ class MCPAppGateway:
             
             await connection.send_message(error_message)
     
+    async def _handle_tool_call_batch(
+        self,
+        connection: AppConnection,
+        message: WebSocketMessage
+    ) -> None:
+        """
+        Maneja un lote de llamadas a herramientas ejecutándolas en paralelo.
+        
+        El mensaje trae en data["tool_calls"] una lista de
+        {"tool_name", "arguments", "id"}. Todas las llamadas se lanzan
+        concurrentemente y se responde con un único TOOL_BATCH_RESULT que
+        contiene un resultado (o error) por llamada, en el mismo orden.
+        
+        Args:
+            connection: Conexión de la App
+            message: Mensaje con el lote de llamadas
+        """
+        tool_calls = message.data.get("tool_calls")
+        
+        if not isinstance(tool_calls, list) or not tool_calls:
+            await connection.send_error("Falta la lista de herramientas (tool_calls)")
+            return
+        
+        if any(not isinstance(call, dict) or not call.get("tool_name") for call in tool_calls):
+            await connection.send_error("Falta el nombre de la herramienta en tool_calls")
+            return
+        
+        # Ejecutar todas las herramientas concurrentemente
+        outcomes = await asyncio.gather(
+            *(
+                self.router.call_tool(call["tool_name"], call.get("arguments", {}))
+                for call in tool_calls
+            ),
+            return_exceptions=True
+        )
+        
+        results = []
+        for call, outcome in zip(tool_calls, outcomes):
+            entry = {
+                "tool_name": call["tool_name"],
+                "correlation_id": call.get("id")
+            }
+            
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error ejecutando herramienta {call['tool_name']}: {outcome}")
+                entry["error"] = str(outcome)
+            else:
+                entry["result"] = outcome
+            
+            results.append(entry)
+        
+        result_message = WebSocketMessage(
+            type=MessageType.TOOL_BATCH_RESULT,
+            data={
+                "results": results,
+                "correlation_id": message.message_id
+            }
+        )
+        
+        await connection.send_message(result_message)
+    
     async def _handle_app_ready(
         self,
         connection: AppConnection,
@@ -431,6 +788,9 @@ class MCPAppGateway:
         """
         Maneja el mensaje de que la App está lista.
         
+        La App puede pedir en data["batch"] que los frames que se acumulan
+        se le envíen agrupados en frames BATCH.
+        
         Args:
             connection: Conexión de la App
             message: Mensaje de ready
@@ -440,16 +800,22 @@ class MCPAppGateway:
         # Actualizar estado de la conexión
         connection.state["ready"] = True
         connection.state["ready_at"] = datetime.now().isoformat()
+        connection.batching = message.data.get("batch") is True
         
         # Reenviar estado actualizado
         await self._send_initial_state(connection)
     
-    async def _handle_ping(self, connection: AppConnection) -> None:
+    async def _handle_ping(
+        self,
+        connection: AppConnection,
+        message: Optional[WebSocketMessage] = None
+    ) -> None:
         """
         Maneja un mensaje PING.
         
         Args:
             connection: Conexión de la App
+            message: Mensaje PING recibido (no se usa)
         """
         pong_message = WebSocketMessage(type=MessageType.PONG, data={})
         await connection.send_message(pong_message)
@@ -466,6 +832,12 @@ class MCPAppGateway:
             logger.info(f"Limpiando conexión: {connection_id}")
             
             del self.connections[connection_id]
+            self._unindex_connection(connection)
+            
+            # Enviar lo pendiente (p. ej. un error fatal) antes de detener
+            # la tarea escritora, que descarta la cola
+            await connection.drain()
+            await connection.stop_writer()
             self._notify_observers("connection_closed", {
                 "connection_id": connection_id,
                 "app_id": connection.app_id,
@@ -494,10 +866,7 @@ class MCPAppGateway:
         Returns:
             Lista de conexiones de la App
         """
-        return [
-            conn for conn in self.connections.values()
-            if conn.app_id == app_id
-        ]
+        return list(self._by_app.get(app_id, {}).values())
     
     def get_connections_by_tenant(self, tenant_id: str) -> List[AppConnection]:
         """
@@ -509,10 +878,7 @@ class MCPAppGateway:
         Returns:
             Lista de conexiones del tenant
         """
-        return [
-            conn for conn in self.connections.values()
-            if conn.tenant_id == tenant_id
-        ]
+        return list(self._by_tenant.get(tenant_id, {}).values())
     
     def get_all_connections(self) -> List[AppConnection]:
         """
@@ -523,6 +889,26 @@ class MCPAppGateway:
         """
         return list(self.connections.values())
     
+    async def _send_broadcast_frame(self, connection: AppConnection, frame: str) -> None:
+        """
+        Envía un frame de broadcast y limpia la conexión si se cerró.
+        
+        Una conexión cuya cola de salida se llena se cierra al enviar;
+        se retira del gateway para que los broadcasts siguientes no la
+        vuelvan a intentar.
+        
+        Args:
+            connection: Conexión destino
+            frame: Frame JSON serializado
+        """
+        try:
+            await connection.send_frame(frame)
+        except Exception as e:
+            logger.error(f"Error enviando a conexión {connection.connection_id}: {e}")
+        
+        if connection.closed:
+            await self._cleanup_connection(connection.connection_id)
+    
     async def broadcast_to_app(
         self,
         app_id: str,
@@ -539,12 +925,10 @@ class MCPAppGateway:
             Número de conexiones a las que se envió
         """
         connections = self.get_connections_by_app(app_id)
+        frame = message.to_json()
         
         for connection in connections:
-            try:
-                await connection.send_message(message)
-            except Exception as e:
-                logger.error(f"Error enviando a conexión {connection.connection_id}: {e}")
+            await self._send_broadcast_frame(connection, frame)
         
         return len(connections)
     
@@ -564,12 +948,10 @@ class MCPAppGateway:
             Número de conexiones a las que se envió
         """
         connections = self.get_connections_by_tenant(tenant_id)
+        frame = message.to_json()
         
         for connection in connections:
-            try:
-                await connection.send_message(message)
-            except Exception as e:
-                logger.error(f"Error enviando a conexión {connection.connection_id}: {e}")
+            await self._send_broadcast_frame(connection, frame)
         
         return len(connections)
     
@@ -583,11 +965,10 @@ class MCPAppGateway:
         Returns:
             Número de conexiones a las que se envió
         """
-        for connection in self.connections.values():
-            try:
-                await connection.send_message(message)
-            except Exception as e:
-                logger.error(f"Error enviando a conexión {connection.connection_id}: {e}")
+        frame = message.to_json()
+        
+        for connection in list(self.connections.values()):
+            await self._send_broadcast_frame(connection, frame)
         
         return len(self.connections)
     
@@ -598,18 +979,13 @@ class MCPAppGateway:
         Returns:
             Diccionario con estadísticas del gateway
         """
-        connections_by_tenant: Dict[str, int] = {}
-        connections_by_app: Dict[str, int] = {}
-        
-        for connection in self.connections.values():
-            connections_by_tenant[connection.tenant_id] = \
-                connections_by_tenant.get(connection.tenant_id, 0) + 1
-            connections_by_app[connection.app_id] = \
-                connections_by_app.get(connection.app_id, 0) + 1
-        
         return {
             "total_connections": len(self.connections),
-            "connections_by_tenant": connections_by_tenant,
-            "connections_by_app": connections_by_app,
+            "connections_by_tenant": {
+                tenant_id: len(conns) for tenant_id, conns in self._by_tenant.items()
+            },
+            "connections_by_app": {
+                app_id: len(conns) for app_id, conns in self._by_app.items()
+            },
             "uptime": "N/A"  # Se puede implementar con un timestamp de inicio
         }
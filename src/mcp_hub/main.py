@@ -24,13 +24,16 @@ import asyncio
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Hashable, Tuple
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, HTMLResponse
+import orjson
+from fastapi import BackgroundTasks, FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 # Añadir directorio src al path
@@ -43,6 +46,8 @@ from mcp_hub.core.multitenant import MultitenantManager
 from mcp_hub.gateway.websocket import MCPAppGateway
 from mcp_hub.gateway.ui_proxy import UIProxy
 from mcp_hub.gateway.websocket import WebSocketMessage, MessageType
+from mcp_hub.responses import ORJSONResponse, json_dumps
+from mcp_hub.transport.stdio_client import StdioClientWrapper
 
 
 # Configurar logging
@@ -61,6 +66,76 @@ _multitenant_manager: Optional[MultitenantManager] = None
 _gateway: Optional[MCPAppGateway] = None
 _ui_proxy: Optional[UIProxy] = None
 
+# Caché de respuestas de listados: clave -> (versión, instante, cuerpo JSON)
+RESPONSE_CACHE_TTL = 2.0
+_response_cache: Dict[str, Tuple[Hashable, float, bytes]] = {}
+
+
+def _cached_json(key: str, version: Hashable, build: Callable[[], Any]) -> bytes:
+    """
+    Retorna el cuerpo JSON de un listado, cacheado por versión y TTL.
+    
+    El cuerpo se serializa una sola vez mientras la versión de origen no
+    cambie y no haya expirado el TTL, de modo que el sondeo frecuente de
+    los dashboards no recorre servidores y herramientas en cada petición.
+    
+    Args:
+        key: Clave del listado cacheado
+        version: Versión actual del estado del que depende el listado
+        build: Función que construye el contenido si no hay caché válida
+        
+    Returns:
+        Cuerpo JSON ya serializado
+    """
+    now = time.monotonic()
+    cached = _response_cache.get(key)
+    
+    if cached and cached[0] == version and now - cached[1] < RESPONSE_CACHE_TTL:
+        return cached[2]
+    
+    body = json_dumps(build())
+    _response_cache[key] = (version, now, body)
+    return body
+
+
+# Cuerpos de error constantes, serializados una sola vez al importar
+_ERR_REGISTRY = orjson.dumps({"error": "Registry no inicializado"})
+_ERR_ORCHESTRATOR = orjson.dumps({"error": "Orchestrator no inicializado"})
+_ERR_ROUTER = orjson.dumps({"error": "Router no inicializado"})
+_ERR_MULTITENANT = orjson.dumps({"error": "MultitenantManager no inicializado"})
+_ERR_GATEWAY = orjson.dumps({"error": "Gateway no inicializado"})
+_ERR_UI_PROXY = orjson.dumps({"error": "UIProxy no inicializado"})
+_ERR_TENANT_NOT_FOUND = orjson.dumps({"error": "Tenant no encontrado"})
+_ERR_SERVER_NOT_FOUND = orjson.dumps({"error": "Servidor no encontrado"})
+_ERR_SERVER_UNAVAILABLE = orjson.dumps({"error": "Servidor no disponible"})
+_ERR_TOOL_NOT_FOUND = orjson.dumps({"error": "Herramienta no encontrada"})
+_ERR_APP_NOT_FOUND = orjson.dumps({"error": "Aplicación no encontrada"})
+_ERR_RESOURCE_NOT_FOUND = orjson.dumps({"error": "Recurso no encontrado"})
+_ERR_INVALID_JSON = orjson.dumps({"error": "JSON inválido en el cuerpo"})
+_ERR_INVALID_ARGUMENTS = orjson.dumps(
+    {"error": "Los argumentos de la herramienta deben ser un objeto JSON"}
+)
+_ERR_INVALID_SERVER_IDS = orjson.dumps(
+    {"error": "El campo ids debe ser una lista de IDs de servidor (strings)"}
+)
+
+
+def _error_response(body: bytes, status_code: int) -> Response:
+    """
+    Construye una respuesta de error a partir de un cuerpo ya serializado.
+    
+    Se crea una Response nueva por petición en lugar de compartir una
+    instancia: los middlewares (CORS, GZip) modifican sus headers.
+    
+    Args:
+        body: Cuerpo JSON pre-serializado
+        status_code: Código de estado HTTP
+        
+    Returns:
+        Response JSON con el error
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -161,7 +236,8 @@ app = FastAPI(
     title="MCP Hub",
     description="Orquestador Multitenant para Servidores MCP y MCP Apps",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS
@@ -173,17 +249,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respuestas medianas y grandes (listados y assets de Apps)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ============================================================================
 # Endpoints de Salud y Estado
 # ============================================================================
 
 @app.get("/")
-async def root() -> JSONResponse:
+async def root() -> ORJSONResponse:
     """
     Endpoint raíz con información del Hub.
     """
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "name": "MCP Hub",
         "version": "0.1.0",
         "status": "running",
@@ -192,11 +271,11 @@ async def root() -> JSONResponse:
 
 
 @app.get("/health")
-async def health() -> JSONResponse:
+async def health() -> ORJSONResponse:
     """
     Endpoint de salud para monitoreo.
     """
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "status": "healthy",
         "components": {
             "registry": _registry is not None,
@@ -214,85 +293,85 @@ async def health() -> JSONResponse:
 # ============================================================================
 
 @app.get("/api/tenants")
-async def list_tenants() -> JSONResponse:
+async def list_tenants() -> ORJSONResponse:
     """
     Lista todos los tenants configurados.
     """
     if not _registry:
-        return JSONResponse(content={"error": "Registry no inicializado"}, status_code=500)
+        return _error_response(_ERR_REGISTRY, 500)
     
     tenants_info = {}
     for tenant_id in _registry.get_all_tenants():
         tenant_status = _multitenant_manager.get_tenant_status(tenant_id)
         tenants_info[tenant_id] = tenant_status
     
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "tenants": tenants_info,
         "total": len(tenants_info)
     })
 
 
 @app.get("/api/tenants/{tenant_id}")
-async def get_tenant(tenant_id: str) -> JSONResponse:
+async def get_tenant(tenant_id: str) -> ORJSONResponse:
     """
     Obtiene información detallada de un tenant.
     """
     if not _multitenant_manager:
-        return JSONResponse(content={"error": "MultitenantManager no inicializado"}, status_code=500)
+        return _error_response(_ERR_MULTITENANT, 500)
     
     status = _multitenant_manager.get_tenant_status(tenant_id)
     
     if not status:
-        return JSONResponse(content={"error": "Tenant no encontrado"}, status_code=404)
+        return _error_response(_ERR_TENANT_NOT_FOUND, 404)
     
-    return JSONResponse(content=status)
+    return ORJSONResponse(content=status)
 
 
 @app.get("/api/tenants/{tenant_id}/tools")
-async def get_tenant_tools(tenant_id: str) -> JSONResponse:
+async def get_tenant_tools(tenant_id: str) -> ORJSONResponse:
     """
     Lista las herramientas disponibles para un tenant.
     """
     if not _multitenant_manager:
-        return JSONResponse(content={"error": "MultitenantManager no inicializado"}, status_code=500)
+        return _error_response(_ERR_MULTITENANT, 500)
     
     tools_summary = _multitenant_manager.get_tenant_tools_summary(tenant_id)
-    return JSONResponse(content=tools_summary)
+    return ORJSONResponse(content=tools_summary)
 
 
 @app.post("/api/tenants/{tenant_id}/start")
-async def start_tenant(tenant_id: str) -> JSONResponse:
+async def start_tenant(tenant_id: str) -> ORJSONResponse:
     """
     Inicia todos los servidores de un tenant.
     """
     if not _multitenant_manager:
-        return JSONResponse(content={"error": "MultitenantManager no inicializado"}, status_code=500)
+        return _error_response(_ERR_MULTITENANT, 500)
     
     try:
         servers = await _multitenant_manager.start_tenant_servers(tenant_id)
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": f"Servidores iniciados para tenant {tenant_id}",
             "servers_count": len(servers)
         })
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.post("/api/tenants/{tenant_id}/stop")
-async def stop_tenant(tenant_id: str) -> JSONResponse:
+async def stop_tenant(tenant_id: str) -> ORJSONResponse:
     """
     Detiene todos los servidores de un tenant.
     """
     if not _multitenant_manager:
-        return JSONResponse(content={"error": "MultitenantManager no inicializado"}, status_code=500)
+        return _error_response(_ERR_MULTITENANT, 500)
     
     try:
         await _multitenant_manager.stop_tenant_servers(tenant_id)
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": f"Servidores detenidos para tenant {tenant_id}"
         })
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 # ============================================================================
@@ -300,113 +379,268 @@ async def stop_tenant(tenant_id: str) -> JSONResponse:
 # ============================================================================
 
 @app.get("/api/servers")
-async def list_servers() -> JSONResponse:
+async def list_servers() -> Response:
     """
     Lista todos los servidores gestionados.
     """
     if not _orchestrator:
-        return JSONResponse(content={"error": "Orchestrator no inicializado"}, status_code=500)
+        return _error_response(_ERR_ORCHESTRATOR, 500)
     
-    servers_status = _orchestrator.get_all_servers_status()
-    return JSONResponse(content={
-        "servers": servers_status,
-        "total": len(servers_status)
-    })
+    return Response(content=_orchestrator.status_snapshot, media_type="application/json")
 
 
 @app.get("/api/servers/{tenant_id}/{server_name}")
-async def get_server(tenant_id: str, server_name: str) -> JSONResponse:
+async def get_server(tenant_id: str, server_name: str) -> Response:
     """
     Obtiene el estado de un servidor específico.
     """
     if not _orchestrator:
-        return JSONResponse(content={"error": "Orchestrator no inicializado"}, status_code=500)
+        return _error_response(_ERR_ORCHESTRATOR, 500)
     
-    server_id = f"{tenant_id}:{server_name}"
-    status = _orchestrator.get_server_status(server_id)
+    server_id = _orchestrator.server_id(tenant_id, server_name)
+    status = _orchestrator.get_server_status_bytes(server_id)
     
-    if not status:
-        return JSONResponse(content={"error": "Servidor no encontrado"}, status_code=404)
+    if status is None:
+        return _error_response(_ERR_SERVER_NOT_FOUND, 404)
+    
+    return Response(content=status, media_type="application/json")
+
+
+@app.get("/api/servers/{tenant_id}/{server_name}/tools")
+async def get_server_tools(tenant_id: str, server_name: str) -> Response:
+    """
+    Lista las herramientas de un servidor específico.
+    """
+    if not _orchestrator:
+        return _error_response(_ERR_ORCHESTRATOR, 500)
+    
+    server_id = _orchestrator.server_id(tenant_id, server_name)
+    client = _orchestrator.get_server_client(server_id)
+    
+    if not client or not client.is_initialized:
+        return _error_response(_ERR_SERVER_UNAVAILABLE, 404)
+    
+    return Response(content=client.cached_tools_json(), media_type="application/json")
+
+
+async def _discover_tools_safe(server_id: str) -> None:
+    """
+    Descubre las herramientas de un servidor registrando los fallos.
+    
+    Pensado para ejecutarse en segundo plano, donde no hay un cliente
+    esperando la excepción.
+    
+    Args:
+        server_id: ID del servidor
+    """
+    try:
+        await _router.discover_tools(server_id)
+    except Exception as e:
+        logger.error(f"Error descubriendo herramientas de {server_id}: {e}")
+
+
+async def _start_and_discover(server_id: str) -> Dict[str, Any]:
+    """
+    Inicia un servidor y descubre sus herramientas.
+    
+    Args:
+        server_id: ID del servidor (formato: "tenant_id:server_name")
+        
+    Returns:
+        Diccionario con el estado final del servidor
+        
+    Raises:
+        ValueError: Si el servidor no existe en el registry
+    """
+    server = await _orchestrator.start_server(server_id)
+    tools = await _router.discover_tools(server_id)
     
-    return JSONResponse(content=status)
+    return {
+        "state": server.state.name,
+        "tools_count": len(tools)
+    }
+
+
+@app.post("/api/servers/start_bulk")
+async def start_servers_bulk(request: Request) -> ORJSONResponse:
+    """
+    Inicia varios servidores en paralelo.
+    
+    Espera un cuerpo {"ids": ["tenant_id:server_name", ...]}; los
+    handshakes MCP se solapan, por lo que el tiempo total es el del
+    servidor más lento y no la suma de todos. Los IDs repetidos se
+    inician una sola vez.
+    """
+    if not _orchestrator:
+        return _error_response(_ERR_ORCHESTRATOR, 500)
+    
+    body = await request.body()
+    try:
+        payload = orjson.loads(body) if body else {}
+    except orjson.JSONDecodeError:
+        return _error_response(_ERR_INVALID_JSON, 400)
+    
+    if not isinstance(payload, dict):
+        return _error_response(_ERR_INVALID_JSON, 400)
+    
+    requested = payload.get("ids", [])
+    if not isinstance(requested, list) or not all(isinstance(sid, str) for sid in requested):
+        return _error_response(_ERR_INVALID_SERVER_IDS, 400)
+    
+    # Deduplicar conservando el orden de la petición
+    server_ids = list(dict.fromkeys(requested))
+    
+    outcomes = await asyncio.gather(
+        *(_start_and_discover(server_id) for server_id in server_ids),
+        return_exceptions=True
+    )
+    
+    results = {}
+    for server_id, outcome in zip(server_ids, outcomes):
+        if isinstance(outcome, BaseException):
+            results[server_id] = {"error": str(outcome)}
+        else:
+            results[server_id] = outcome
+    
+    return ORJSONResponse(content={
+        "results": results,
+        "started": sum(1 for outcome in outcomes if not isinstance(outcome, BaseException)),
+        "total": len(server_ids)
+    })
 
 
 @app.post("/api/servers/{tenant_id}/{server_name}/start")
-async def start_server(tenant_id: str, server_name: str) -> JSONResponse:
+async def start_server(
+    tenant_id: str,
+    server_name: str,
+    background_tasks: BackgroundTasks
+) -> ORJSONResponse:
     """
     Inicia un servidor específico.
+    
+    El descubrimiento de herramientas se realiza tras enviar la respuesta.
     """
     if not _orchestrator:
-        return JSONResponse(content={"error": "Orchestrator no inicializado"}, status_code=500)
+        return _error_response(_ERR_ORCHESTRATOR, 500)
+    
+    if not _registry.get_server_config(tenant_id, server_name):
+        return _error_response(_ERR_SERVER_NOT_FOUND, 404)
     
     try:
-        server_id = f"{tenant_id}:{server_name}"
+        server_id = _orchestrator.server_id(tenant_id, server_name)
         server = await _orchestrator.start_server(server_id)
         
-        # Descubrir herramientas
-        await _router.discover_tools(server_id)
+        # Descubrir herramientas en segundo plano
+        background_tasks.add_task(_discover_tools_safe, server_id)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": f"Servidor iniciado: {server_id}",
             "state": server.state.name
         })
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.post("/api/servers/{tenant_id}/{server_name}/stop")
-async def stop_server(tenant_id: str, server_name: str) -> JSONResponse:
+async def stop_server(tenant_id: str, server_name: str) -> ORJSONResponse:
     """
     Detiene un servidor específico.
     """
     if not _orchestrator:
-        return JSONResponse(content={"error": "Orchestrator no inicializado"}, status_code=500)
+        return _error_response(_ERR_ORCHESTRATOR, 500)
     
     try:
-        server_id = f"{tenant_id}:{server_name}"
+        server_id = _orchestrator.server_id(tenant_id, server_name)
         await _orchestrator.stop_server(server_id)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "message": f"Servidor detenido: {server_id}"
         })
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 # ============================================================================
 # Endpoints de Herramientas
 # ============================================================================
 
+def _initialized_clients() -> Dict[str, StdioClientWrapper]:
+    """
+    Retorna los clientes con sesión MCP inicializada, por ID de servidor.
+    
+    Returns:
+        Diccionario server_id -> StdioClientWrapper
+    """
+    if not _orchestrator:
+        return {}
+    
+    clients = {}
+    for server_id in _orchestrator.managed_servers:
+        client = _orchestrator.get_server_client(server_id)
+        if client and client.is_initialized:
+            clients[server_id] = client
+    return clients
+
+
 @app.get("/api/tools")
-async def list_tools() -> JSONResponse:
+async def list_tools() -> Response:
     """
     Lista todas las herramientas disponibles en el Hub.
+    
+    Al resumen del Router se añade la llave "servers" con los metadatos
+    de las herramientas de cada servidor inicializado. Esos metadatos se
+    incrustan como fragmentos JSON ya serializados por cada cliente, y
+    el cuerpo completo se cachea por versión del Router y conjunto de
+    servidores inicializados.
     """
     if not _router:
-        return JSONResponse(content={"error": "Router no inicializado"}, status_code=500)
+        return _error_response(_ERR_ROUTER, 500)
+    
+    clients = _initialized_clients()
     
-    summary = _router.get_tools_summary()
-    return JSONResponse(content=summary)
+    def build() -> Dict[str, Any]:
+        return {
+            **_router.get_tools_summary(),
+            "servers": {
+                server_id: orjson.Fragment(client.cached_tools_json())
+                for server_id, client in clients.items()
+            }
+        }
+    
+    body = _cached_json("tools", (_router.version, frozenset(clients)), build)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/api/tools/{tool_name}/call")
-async def call_tool(tool_name: str, request: Request) -> JSONResponse:
+async def call_tool(tool_name: str, request: Request) -> ORJSONResponse:
     """
     Ejecuta una llamada a una herramienta.
     """
     if not _router:
-        return JSONResponse(content={"error": "Router no inicializado"}, status_code=500)
+        return _error_response(_ERR_ROUTER, 500)
+    
+    if not _router.get_tool(tool_name):
+        return _error_response(_ERR_TOOL_NOT_FOUND, 404)
+    
+    # Decodificar el cuerpo directamente con orjson; un cuerpo vacío equivale a {}
+    body = await request.body()
+    try:
+        arguments = orjson.loads(body) if body else {}
+    except orjson.JSONDecodeError:
+        return _error_response(_ERR_INVALID_JSON, 400)
+    
+    if not isinstance(arguments, dict):
+        return _error_response(_ERR_INVALID_ARGUMENTS, 400)
     
     try:
-        arguments = await request.json()
         result = await _router.call_tool(tool_name, arguments)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "tool": tool_name,
             "result": result
         })
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 # ============================================================================
@@ -434,28 +668,31 @@ async def websocket_endpoint(websocket: WebSocket, app_id: str, tenant_id: str):
 # ============================================================================
 
 @app.get("/api/apps")
-async def list_apps() -> JSONResponse:
+async def list_apps() -> ORJSONResponse:
     """
     Lista todas las MCP Apps disponibles.
     """
     if not _ui_proxy:
-        return JSONResponse(content={"error": "UIProxy no inicializado"}, status_code=500)
+        return _error_response(_ERR_UI_PROXY, 500)
     
     return await _ui_proxy.list_apps()
 
 
 @app.get("/api/apps/{app_id}")
-async def get_app_info(app_id: str) -> JSONResponse:
+async def get_app_info(app_id: str) -> ORJSONResponse:
     """
     Obtiene información detallada de una MCP App.
     """
     if not _ui_proxy:
-        return JSONResponse(content={"error": "UIProxy no inicializado"}, status_code=500)
+        return _error_response(_ERR_UI_PROXY, 500)
+    
+    if not _ui_proxy.has_app(app_id):
+        return _error_response(_ERR_APP_NOT_FOUND, 404)
     
     try:
         return await _ui_proxy.get_app_info(app_id)
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.get("/apps/{app_id}")
@@ -466,11 +703,16 @@ async def serve_app(app_id: str, tenant_id: str = "default", request: Request =
     if not _ui_proxy:
         return HTMLResponse(content="<h1>Error: UIProxy no inicializado</h1>", status_code=500)
     
+    file_path = _ui_proxy.find_resource(app_id, "index.html")
+    if file_path is None:
+        return HTMLResponse(content="<h1>Error: Aplicación no encontrada</h1>", status_code=404)
+    
     try:
         return await _ui_proxy.serve_app_index(
             app_id,
             tenant_id,
-            request
+            request,
+            file_path=file_path
         )
     except Exception as e:
         return HTMLResponse(content=f"<h1>Error: {str(e)}</h1>", status_code=500)
@@ -481,21 +723,26 @@ async def serve_app_resource(
     app_id: str,
     resource_path: str,
     request: Request
-) -> JSONResponse:
+) -> Response:
     """
     Sirve recursos estáticos de una MCP App.
     """
     if not _ui_proxy:
-        return JSONResponse(content={"error": "UIProxy no inicializado"}, status_code=500)
+        return _error_response(_ERR_UI_PROXY, 500)
+    
+    file_path = _ui_proxy.find_resource(app_id, resource_path)
+    if file_path is None:
+        return _error_response(_ERR_RESOURCE_NOT_FOUND, 404)
     
     try:
         return await _ui_proxy.serve_resource(
             app_id,
             resource_path,
-            request
+            request,
+            file_path=file_path
         )
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=404)
+        return ORJSONResponse(content={"error": str(e)}, status_code=404)
 
 
 # ============================================================================
@@ -503,14 +750,14 @@ async def serve_app_resource(
 # ============================================================================
 
 @app.get("/api/gateway/status")
-async def gateway_status() -> JSONResponse:
+async def gateway_status() -> ORJSONResponse:
     """
     Retorna el estado actual del gateway WebSocket.
     """
     if not _gateway:
-        return JSONResponse(content={"error": "Gateway no inicializado"}, status_code=500)
+        return _error_response(_ERR_GATEWAY, 500)
     
-    return JSONResponse(content=_gateway.get_gateway_status())
+    return ORJSONResponse(content=_gateway.get_gateway_status())
 
 
 # ============================================================================
@@ -522,6 +769,7 @@ def cli():
     Entry point para la CLI del MCP Hub.
     """
     import argparse
+    import importlib.util
     
     parser = argparse.ArgumentParser(description="MCP Hub - Orquestador Multitenant")
     parser.add_argument(
@@ -547,19 +795,34 @@ def cli():
         action="store_true",
         help="Habilitar recarga automática en desarrollo"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos worker (cada uno gestiona sus propios servidores MCP)"
+    )
     
     args = parser.parse_args()
     
     # Configurar variables de entorno
     os.environ["MCP_HUB_CONFIG"] = args.config
     
-    logger.info(f"Iniciando MCP Hub en {args.host}:{args.port}")
+    # uvloop y httptools vienen con uvicorn[standard] salvo en Windows
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    logger.info(f"Iniciando MCP Hub en {args.host}:{args.port} (loop={loop}, http={http})")
     
     uvicorn.run(
         "mcp_hub.main:app",
         host=args.host,
         port=args.port,
         reload=args.reload,
+        workers=1 if args.reload else args.workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=30,
+        limit_concurrency=1000,
         log_level="info"
     )
 
@@ -0,0 +1,84 @@
+"""
+Responses - Respuestas HTTP del MCP Hub
+=========================================
+
+Este módulo define las clases de respuesta HTTP compartidas por la API
+REST y el UI Proxy.
+
+- ORJSONResponse: Respuesta JSON serializada con orjson
+- json_dumps: Serialización compartida con el gateway WebSocket
+
+Se define aquí en lugar de usar fastapi.responses.ORJSONResponse porque
+las versiones recientes de FastAPI la marcan como obsoleta; esta clase
+funciona igual en todo el rango de versiones soportado.
+
+Autor: Ainsophic Team
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+# Opciones comunes: llaves no-str (p. ej. enteros) y arrays numpy nativos
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """
+    Convierte tipos que orjson no serializa de forma nativa.
+    
+    Los resultados de herramientas llegan como modelos pydantic del
+    SDK MCP (p. ej. CallToolResult); se vuelcan con sus alias del
+    protocolo.
+    
+    Args:
+        obj: Objeto no serializable por orjson
+        
+    Returns:
+        Representación JSON-serializable del objeto
+        
+    Raises:
+        TypeError: Si el tipo no está soportado
+    """
+    model_dump = getattr(obj, "model_dump", None)
+    if model_dump is not None:
+        return model_dump(mode="json", by_alias=True, exclude_none=True)
+    
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+def json_dumps(content: Any) -> bytes:
+    """
+    Serializa contenido a JSON con orjson en una sola pasada.
+    
+    Args:
+        content: Contenido a serializar (dicts, dataclasses, numpy, modelos pydantic)
+        
+    Returns:
+        JSON en bytes
+    """
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson.
+    
+    orjson genera directamente bytes UTF-8, evitando el recorrido en
+    Python y la recodificación de json.dumps en respuestas grandes
+    (listados de servidores y herramientas).
+    """
+    
+    def render(self, content: Any) -> bytes:
+        """
+        Serializa el contenido de la respuesta.
+        
+        Args:
+            content: Contenido JSON-serializable
+        
+        Returns:
+            Cuerpo de la respuesta en bytes
+        """
+        return json_dumps(content)
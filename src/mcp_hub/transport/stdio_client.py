@@ -22,9 +22,12 @@ Autor: Ainsophic Team
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import random
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, NamedTuple, Optional
 from dataclasses import dataclass, field
 
+import orjson
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
@@ -32,7 +35,62 @@ from mcp.client.stdio import stdio_client
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Backoff exponencial con jitter completo entre reintentos (segundos)
+RETRY_BACKOFF_BASE = 0.1
+RETRY_BACKOFF_CAP = 2.0
+
+
+def _field(source: Any, name: str, default: Any = None) -> Any:
+    """
+    Lee un campo de un modelo del SDK MCP o de un diccionario equivalente.
+    
+    Args:
+        source: Modelo pydantic, diccionario o None
+        name: Nombre del campo
+        default: Valor si el campo no existe o es None
+        
+    Returns:
+        Valor del campo o el default
+    """
+    if isinstance(source, dict):
+        value = source.get(name)
+    else:
+        value = getattr(source, name, None)
+    return default if value is None else value
+
+
+class ServerCaps(NamedTuple):
+    """
+    Proyección de las capacidades anunciadas por un servidor MCP.
+    
+    Atributos:
+        has_tools: El servidor expone herramientas
+        has_resources: El servidor expone recursos
+        has_prompts: El servidor expone prompts
+    """
+    has_tools: bool = False
+    has_resources: bool = False
+    has_prompts: bool = False
+    
+    @classmethod
+    def from_capabilities(cls, capabilities: Any) -> "ServerCaps":
+        """
+        Calcula la proyección a partir de las capacidades del handshake.
+        
+        Args:
+            capabilities: ServerCapabilities del SDK o diccionario equivalente
+            
+        Returns:
+            ServerCaps con un flag por capacidad
+        """
+        return cls(
+            has_tools=_field(capabilities, "tools") is not None,
+            has_resources=_field(capabilities, "resources") is not None,
+            has_prompts=_field(capabilities, "prompts") is not None
+        )
+
+
+@dataclass(slots=True)
 class ToolInfo:
     """
     Información sobre una herramienta MCP.
@@ -47,7 +105,7 @@ class ToolInfo:
     input_schema: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ServerInfo:
     """
     Información sobre un servidor MCP.
@@ -55,13 +113,15 @@ class ServerInfo:
     Atributos:
         name: Nombre del servidor
         version: Versión del protocolo MCP soportada
-        capabilities: Lista de capacidades soportadas
+        capabilities: Capacidades soportadas tal como las anunció el servidor
         tools: Diccionario de herramientas disponibles
+        caps: Flags de capacidades precalculados
     """
     name: str
     version: str = "1.0.0"
     capabilities: Dict[str, Any] = field(default_factory=dict)
     tools: Dict[str, ToolInfo] = field(default_factory=dict)
+    caps: ServerCaps = ServerCaps()
 
 
 class MCPConnectionError(Exception):
@@ -120,10 +180,17 @@ class StdioClientWrapper:
         self.max_retries = max_retries
         
         self._session: Optional[ClientSession] = None
-        self._stdio_context = None
+        self._exit_stack: Optional[AsyncExitStack] = None
         self._connected = False
         self._initialized = False
         self._server_info: Optional[ServerInfo] = None
+        self._tools_json_cache: Optional[bytes] = None
+        self._init_lock = asyncio.Lock()
+        
+        # Contextos async activos que comparten la misma sesión
+        self._context_depth = 0
+        self._context_owns_session = False
+        self._context_lock = asyncio.Lock()
         
         logger.debug(f"StdioClientWrapper inicializado para: {command} {' '.join(args)}")
     
@@ -154,14 +221,22 @@ class StdioClientWrapper:
             return self
         
         try:
-            # Crear contexto stdio
-            server_params = self._get_server_params()
-            self._stdio_context = stdio_client(server_params)
-            read_stream, write_stream = await self._stdio_context.__aenter__()
-            
-            # Crear sesión MCP
-            self._session = ClientSession(read_stream, write_stream)
-            await self._session.__aenter__()
+            # Si algo falla, el stack cierra los contextos ya abiertos
+            # informándoles de la excepción
+            async with AsyncExitStack() as exit_stack:
+                # Crear contexto stdio
+                server_params = self._get_server_params()
+                read_stream, write_stream = await exit_stack.enter_async_context(
+                    stdio_client(server_params)
+                )
+                
+                # Crear sesión MCP
+                self._session = await exit_stack.enter_async_context(
+                    ClientSession(read_stream, write_stream)
+                )
+                
+                # Conservar los contextos abiertos hasta disconnect()
+                self._exit_stack = exit_stack.pop_all()
             
             self._connected = True
             logger.info(f"Conexión establecida con servidor: {self.command}")
@@ -169,14 +244,16 @@ class StdioClientWrapper:
             return self
             
         except Exception as e:
+            self._session = None
             logger.error(f"Error al conectar con servidor: {e}")
-            await self.disconnect()
             raise MCPConnectionError(f"Fallo al conectar: {e}") from e
     
     async def initialize(self) -> ServerInfo:
         """
         Inicializa la sesión MCP y descubre capacidades.
         
+        Las llamadas concurrentes comparten una única inicialización.
+        
         Returns:
             ServerInfo con información del servidor y herramientas disponibles
             
@@ -189,6 +266,23 @@ class StdioClientWrapper:
         if self._initialized:
             return self._server_info
         
+        async with self._init_lock:
+            # Otra tarea pudo completar la inicialización mientras se esperaba
+            if self._initialized:
+                return self._server_info
+            
+            return await self._initialize_session()
+    
+    async def _initialize_session(self) -> ServerInfo:
+        """
+        Realiza el handshake MCP y registra las herramientas del servidor.
+        
+        Returns:
+            ServerInfo con información del servidor y herramientas disponibles
+            
+        Raises:
+            MCPInitializationError: Si falla la inicialización
+        """
         try:
             # Inicializar sesión
             init_result = await asyncio.wait_for(
@@ -196,27 +290,38 @@ class StdioClientWrapper:
                 timeout=self.timeout
             )
             
-            # Extraer información del servidor
-            capabilities = getattr(init_result, 'capabilities', {})
-            server_info = getattr(init_result, 'serverInfo', {})
+            # Extraer información del servidor (modelos del SDK)
+            capabilities = _field(init_result, "capabilities", {})
+            server_info = (
+                _field(init_result, "server_info") or _field(init_result, "serverInfo", {})
+            )
+            
+            if hasattr(capabilities, "model_dump"):
+                raw_capabilities = capabilities.model_dump(exclude_none=True)
+            else:
+                raw_capabilities = dict(capabilities)
             
             # Crear objeto ServerInfo
             self._server_info = ServerInfo(
-                name=server_info.get('name', 'unknown'),
-                version=server_info.get('version', '1.0.0'),
-                capabilities=capabilities
+                name=_field(server_info, "name", "unknown"),
+                version=_field(server_info, "version", "1.0.0"),
+                capabilities=raw_capabilities,
+                caps=ServerCaps.from_capabilities(capabilities)
             )
             
             # Descubrir herramientas si está disponible
-            if 'tools' in capabilities:
+            if self._server_info.caps.has_tools:
                 tools_response = await self._session.list_tools()
                 for tool in tools_response.tools:
                     self._server_info.tools[tool.name] = ToolInfo(
                         name=tool.name,
                         description=tool.description or "",
-                        input_schema=tool.inputSchema or {}
+                        input_schema=(
+                            _field(tool, "input_schema") or _field(tool, "inputSchema", {})
+                        )
                     )
             
+            self._tools_json_cache = self._serialize_tools()
             self._initialized = True
             logger.info(
                 f"Sesión inicializada. Servidor: {self._server_info.name}, "
@@ -251,6 +356,43 @@ class StdioClientWrapper:
         
         return list(self._server_info.tools.values())
     
+    def _serialize_tools(self) -> bytes:
+        """
+        Serializa a JSON los metadatos de las herramientas del servidor.
+        
+        Returns:
+            Lista JSON de herramientas en bytes
+        """
+        return orjson.dumps([
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "input_schema": tool.input_schema
+            }
+            for tool in self._server_info.tools.values()
+        ])
+    
+    def cached_tools_json(self) -> bytes:
+        """
+        Retorna los metadatos de las herramientas ya serializados a JSON.
+        
+        La serialización se hace una vez al inicializar la sesión, de modo
+        que los listados no recorren los ToolInfo en cada petición.
+        
+        Returns:
+            Lista JSON de herramientas en bytes
+            
+        Raises:
+            MCPConnectionError: Si no hay conexión inicializada
+        """
+        if not self._initialized or self._server_info is None:
+            raise MCPConnectionError("Sesión no inicializada. Usar initialize() primero.")
+        
+        if self._tools_json_cache is None:
+            self._tools_json_cache = self._serialize_tools()
+        
+        return self._tools_json_cache
+    
     async def call_tool(
         self,
         tool_name: str,
@@ -301,7 +443,11 @@ class StdioClientWrapper:
                         f"Timeout en llamada a herramienta {tool_name} "
                         f"(intentos {attempt + 1}/{self.max_retries})"
                     )
-                    await asyncio.sleep(1)  # Esperar antes de reintentar
+                    # Esperar antes de reintentar, repartiendo los reintentos concurrentes
+                    await asyncio.sleep(min(
+                        RETRY_BACKOFF_CAP,
+                        random.uniform(0, RETRY_BACKOFF_BASE * (2 ** attempt))
+                    ))
                     
         except asyncio.TimeoutError:
             error_msg = f"Timeout llamando a herramienta {tool_name} ({timeout}s)"
@@ -326,7 +472,7 @@ class StdioClientWrapper:
         if not self._initialized or self._session is None:
             raise MCPConnectionError("Sesión no inicializada. Usar initialize() primero.")
         
-        if 'resources' not in self._server_info.capabilities:
+        if not self._server_info.caps.has_resources:
             logger.warning("El servidor no soporta recursos")
             return []
         
@@ -371,20 +517,17 @@ class StdioClientWrapper:
         if not self._connected:
             return
         
+        exit_stack, self._exit_stack = self._exit_stack, None
+        self._session = None
+        self._connected = False
+        self._initialized = False
+        self._server_info = None
+        self._tools_json_cache = None
+        
         try:
-            # Cerrar sesión MCP
-            if self._session:
-                await self._session.__aexit__(None, None, None)
-                self._session = None
-            
-            # Cerrar contexto stdio
-            if self._stdio_context:
-                await self._stdio_context.__aexit__(None, None, None)
-                self._stdio_context = None
-            
-            self._connected = False
-            self._initialized = False
-            self._server_info = None
+            # Cerrar sesión MCP y contexto stdio en orden inverso de apertura
+            if exit_stack:
+                await exit_stack.aclose()
             
             logger.info("Conexión cerrada exitosamente")
             
@@ -395,18 +538,44 @@ class StdioClientWrapper:
         """
         Implementa el protocolo de contexto async para entrada.
         
+        El contexto es reentrante: si ya hay una sesión activa (abierta
+        por otro contexto o con connect()), se reutiliza en lugar de
+        lanzar un nuevo subproceso y repetir el handshake MCP.
+        
         Returns:
             Self para permitir encadenamiento
         """
-        await self.connect()
-        await self.initialize()
-        return self
+        async with self._context_lock:
+            if self._context_depth == 0 and not self._connected:
+                await self.connect()
+                self._context_owns_session = True
+            
+            try:
+                await self.initialize()
+            except Exception:
+                # Si este contexto abrió la sesión, cerrarla: __aexit__ no
+                # se ejecutará y el subproceso quedaría sin dueño
+                if self._context_depth == 0 and self._context_owns_session:
+                    self._context_owns_session = False
+                    await self.disconnect()
+                raise
+            
+            self._context_depth += 1
+            return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """
         Implementa el protocolo de contexto async para salida.
+        
+        Solo el último contexto activo cierra la sesión, y únicamente si
+        fue abierta por un contexto.
         """
-        await self.disconnect()
+        async with self._context_lock:
+            self._context_depth -= 1
+            
+            if self._context_depth == 0 and self._context_owns_session:
+                self._context_owns_session = False
+                await self.disconnect()
     
     @property
     def is_connected(self) -> bool:
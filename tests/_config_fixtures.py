@@ -0,0 +1,40 @@
+"""
+Config Fixtures - Configuraciones compartidas por los tests
+=============================================================
+
+Configuración mínima del MCP Hub usada por los tests de integración.
+La versión sin tenants se serializa una única vez al importar el
+módulo.
+
+Autor: Ainsophic Team
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict
+
+import orjson
+
+
+_MINIMAL_CONFIG = MappingProxyType({
+    "version": "1.0.0",
+    "tenants": {},
+    "gateway": {"port": 8080, "mcp_port": 8000, "websocket_port": 8081, "host": "0.0.0.0"},
+    "logging": {"level": "INFO", "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"},
+    "orchestrator": {"auto_start": False, "max_retries": 3, "startup_timeout": 30}
+})
+
+MINIMAL_CONFIG_JSON: bytes = orjson.dumps(dict(_MINIMAL_CONFIG))
+
+
+def make_config(tenants: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye una configuración mínima con los tenants indicados.
+
+    Args:
+        tenants: Diccionario de tenants de la configuración
+
+    Returns:
+        Diccionario de configuración completo
+    """
+    return {**_MINIMAL_CONFIG, "tenants": tenants}
+
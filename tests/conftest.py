@@ -0,0 +1,212 @@
+"""
+Configuración compartida de los tests del MCP Hub
+===================================================
+
+Fixtures comunes a todos los módulos de tests. Las configuraciones y
+el Registry de solo lectura tienen alcance de sesión: se construyen una
+vez por worker y se comparten entre archivos.
+
+La suite se ejecuta en paralelo con pytest-xdist (--dist=loadfile):
+cada worker es un proceso propio, pero los tests de un mismo archivo
+comparten proceso y, por lo tanto, el estado global del Registry.
+
+Autor: Ainsophic Team
+"""
+
+import orjson
+import pytest
+from types import SimpleNamespace
+
+from mcp_hub.core.orchestrator import Orchestrator
+from mcp_hub.core.registry import Registry
+from tests._config_fixtures import MINIMAL_CONFIG_JSON
+
+
+# Catálogo vacío compartido por los stubs del Router (inmutable)
+_NO_TOOLS: tuple = ()
+
+
+@pytest.fixture(scope="session")
+def sample_config():
+    """
+    Fixture que retorna una configuración de ejemplo.
+    """
+    return {
+        "version": "1.0.0",
+        "tenants": {
+            "default": {
+                "description": "Tenant por defecto",
+                "servers": {
+                    "postgres": {
+                        "name": "postgres",
+                        "type": "database",
+                        "command": "python",
+                        "args": ["-m", "mcp.server.postgres"],
+                        "enabled": True,
+                        "capabilities": ["tools", "resources"],
+                        "transport": "stdio",
+                        "metadata": {
+                            "description": "Servidor PostgreSQL"
+                        }
+                    }
+                }
+            }
+        },
+        "gateway": {
+            "port": 8080,
+            "mcp_port": 8000,
+            "websocket_port": 8081,
+            "host": "0.0.0.0"
+        },
+        "logging": {
+            "level": "INFO",
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        },
+        "orchestrator": {
+            "auto_start": False,
+            "max_retries": 3,
+            "startup_timeout": 30
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def config_file(sample_config, tmp_path_factory):
+    """
+    Fixture que crea el archivo de configuración una sola vez por sesión.
+    
+    El archivo es de solo lectura para los tests; pytest elimina el
+    directorio temporal al terminar.
+    """
+    config_path = tmp_path_factory.mktemp("config") / "servers.json"
+    config_path.write_bytes(orjson.dumps(sample_config))
+    return str(config_path)
+
+
+@pytest.fixture(scope="session")
+def registry(sample_config):
+    """
+    Fixture que carga el Registry una sola vez para los tests de solo lectura.
+    
+    Se construye desde el diccionario en memoria, sin pasar por disco.
+    La instancia se desacopla del singleton para que los tests que
+    recargan configuración no la modifiquen.
+    """
+    with Registry.isolated():
+        return Registry.load_from_dict(sample_config)
+
+
+@pytest.fixture(scope="session")
+def multitenant_sample_config():
+    """
+    Fixture que retorna una configuración de ejemplo con dos tenants.
+    """
+    return {
+        "version": "1.0.0",
+        "tenants": {
+            "default": {
+                "description": "Tenant por defecto",
+                "servers": {
+                    "postgres": {
+                        "name": "postgres",
+                        "type": "database",
+                        "command": "python",
+                        "args": ["-m", "mcp.server.postgres"],
+                        "enabled": True,
+                        "capabilities": ["tools"],
+                        "transport": "stdio",
+                        "metadata": {}
+                    }
+                }
+            },
+            "production": {
+                "description": "Tenant de producción",
+                "servers": {
+                    "postgres-prod": {
+                        "name": "postgres-prod",
+                        "type": "database",
+                        "command": "python",
+                        "args": ["-m", "mcp.server.postgres"],
+                        "enabled": True,
+                        "capabilities": ["tools"],
+                        "transport": "stdio",
+                        "metadata": {}
+                    }
+                }
+            }
+        },
+        "gateway": {
+            "port": 8080,
+            "mcp_port": 8000,
+            "websocket_port": 8081,
+            "host": "0.0.0.0"
+        },
+        "logging": {
+            "level": "INFO",
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        },
+        "orchestrator": {
+            "auto_start": False,
+            "max_retries": 3,
+            "startup_timeout": 30
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def multitenant_registry(multitenant_sample_config):
+    """
+    Fixture que retorna un Registry con dos tenants, compartido por la sesión.
+    
+    Se desacopla del singleton igual que el fixture registry.
+    """
+    with Registry.isolated():
+        return Registry.load_from_dict(multitenant_sample_config)
+
+
+@pytest.fixture(scope="session")
+def minimal_config():
+    """
+    Fixture que retorna la configuración mínima sin tenants.
+    """
+    return orjson.loads(MINIMAL_CONFIG_JSON)
+
+
+@pytest.fixture(scope="session")
+def mock_orchestrator():
+    """
+    Fixture que crea un stub del Orchestrator para el MultitenantManager.
+    
+    El manager solo consulta atributos fijos; un SimpleNamespace evita
+    la maquinaria de MagicMock cuando no se verifican llamadas. El stub
+    no tiene estado, por lo que se comparte por la sesión.
+    """
+    return SimpleNamespace(
+        _parse_server_id=Orchestrator._parse_server_id,
+        get_server_client=lambda server_id: None
+    )
+
+
+@pytest.fixture(scope="session")
+def mock_router():
+    """
+    Fixture que crea un stub del Router sin herramientas registradas.
+    """
+    return SimpleNamespace(
+        clear_tools=lambda server_id: None,
+        get_tools_by_server=lambda server_id: _NO_TOOLS
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton():
+    """
+    Fixture que aísla el estado global del Registry en cada test.
+    
+    Los tests de singleton y recarga modifican el singleton y la caché
+    de archivos parseados; así no se filtra estado entre tests del
+    mismo worker.
+    """
+    with Registry.isolated():
+        yield
+    Registry._load_cached.cache_clear()
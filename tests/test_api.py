@@ -0,0 +1,232 @@
+"""
+Tests de la API HTTP - Endpoints de gestión
+=============================================
+
+Tests unitarios para los endpoints de main que no requieren servidores
+MCP reales; el orquestador y el descubrimiento se sustituyen por fakes.
+
+Autor: Ainsophic Team
+"""
+
+import orjson
+import pytest
+from types import SimpleNamespace
+
+from mcp_hub import main
+from mcp_hub.core.orchestrator import ServerState
+
+
+class FakeRequest:
+    """
+    Request mínima que solo expone el cuerpo crudo.
+    """
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def body(self) -> bytes:
+        return self._body
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """
+    Fixture que registra los IDs que el endpoint de arranque masivo inicia.
+
+    Sustituye el Orchestrator y el Router, de modo que se ejecuta el
+    _start_and_discover real; "default:missing" no existe en el registry.
+    """
+    started = []
+
+    async def start_server(server_id):
+        if server_id == "default:missing":
+            raise ValueError(f"Servidor no encontrado: {server_id}")
+        started.append(server_id)
+        return SimpleNamespace(state=ServerState.RUNNING)
+
+    async def discover_tools(server_id):
+        return ["query", "schema"]
+
+    monkeypatch.setattr(main, "_orchestrator", SimpleNamespace(start_server=start_server))
+    monkeypatch.setattr(main, "_router", SimpleNamespace(discover_tools=discover_tools))
+    return started
+
+
+@pytest.mark.parametrize("body", [
+    b'{"ids": "default:postgres"}',
+    b'{"ids": ["default:postgres", 1]}',
+    b'{"ids": {"default:postgres": true}}',
+])
+async def test_start_bulk_rejects_invalid_ids(started, body):
+    """
+    Test: ids debe ser una lista de strings.
+    """
+    response = await main.start_servers_bulk(FakeRequest(body))
+
+    assert response.status_code == 400
+    assert response.body == main._ERR_INVALID_SERVER_IDS
+    assert started == []
+
+
+@pytest.mark.parametrize("body", [b'["default:postgres"]', b'"default:postgres"', b"{"])
+async def test_start_bulk_rejects_non_object_body(started, body):
+    """
+    Test: Un cuerpo que no es un objeto JSON produce 400, no 500.
+    """
+    response = await main.start_servers_bulk(FakeRequest(body))
+
+    assert response.status_code == 400
+    assert response.body == main._ERR_INVALID_JSON
+    assert started == []
+
+
+async def test_start_bulk_dedupes_ids(started):
+    """
+    Test: Los IDs repetidos se inician una sola vez y no inflan el total.
+    """
+    body = orjson.dumps({
+        "ids": ["default:postgres", "default:missing", "default:postgres"]
+    })
+
+    response = await main.start_servers_bulk(FakeRequest(body))
+    data = orjson.loads(response.body)
+
+    assert response.status_code == 200
+    assert started == ["default:postgres"]
+    assert data["total"] == 2
+    assert data["started"] == 1
+    assert data["results"] == {
+        "default:postgres": {"state": "RUNNING", "tools_count": 2},
+        "default:missing": {"error": "Servidor no encontrado: default:missing"}
+    }
+
+
+@pytest.fixture
+def tools_api(monkeypatch):
+    """
+    Fixture que instala un Router y un Orchestrator falsos para /api/tools.
+
+    Retorna los clientes gestionados y la lista de llamadas al resumen
+    del Router, para comprobar cuándo se reconstruye el cuerpo.
+    """
+    summaries = []
+
+    def get_tools_summary():
+        summaries.append(router.version)
+        return {"total_tools": 1, "all_tools": ["postgres.query"]}
+
+    clients = {
+        "default:postgres": SimpleNamespace(
+            is_initialized=True,
+            cached_tools_json=lambda: b'[{"name":"query","description":null,"input_schema":{}}]'
+        ),
+        "default:redis": SimpleNamespace(is_initialized=False, cached_tools_json=None)
+    }
+    router = SimpleNamespace(version=1, get_tools_summary=get_tools_summary)
+    orchestrator = SimpleNamespace(managed_servers=clients, get_server_client=clients.get)
+
+    monkeypatch.setattr(main, "_response_cache", {})
+    monkeypatch.setattr(main, "_router", router)
+    monkeypatch.setattr(main, "_orchestrator", orchestrator)
+    return SimpleNamespace(clients=clients, router=router, summaries=summaries)
+
+
+async def test_list_tools_reuses_client_serialization(tools_api):
+    """
+    Test: /api/tools incluye los bytes cacheados de cada cliente inicializado.
+    """
+    data = orjson.loads((await main.list_tools()).body)
+
+    assert data["total_tools"] == 1
+    assert data["all_tools"] == ["postgres.query"]
+    assert data["servers"] == {
+        "default:postgres": [{"name": "query", "description": None, "input_schema": {}}]
+    }
+
+
+async def test_list_tools_handles_empty_summary(tools_api, monkeypatch):
+    """
+    Test: Un resumen vacío sigue produciendo un objeto JSON válido.
+    """
+    monkeypatch.setattr(tools_api.router, "get_tools_summary", dict)
+
+    data = orjson.loads((await main.list_tools()).body)
+
+    assert list(data) == ["servers"]
+
+
+async def test_list_tools_cache_tracks_initialized_clients(tools_api):
+    """
+    Test: El cuerpo se reutiliza hasta que cambia el Router o los clientes.
+    """
+    first = (await main.list_tools()).body
+    assert (await main.list_tools()).body == first
+    assert tools_api.summaries == [1]
+
+    tools_api.clients["default:redis"].is_initialized = True
+    tools_api.clients["default:redis"].cached_tools_json = lambda: b"[]"
+    data = orjson.loads((await main.list_tools()).body)
+    assert data["servers"]["default:redis"] == []
+
+    tools_api.router.version = 2
+    await main.list_tools()
+    assert tools_api.summaries == [1, 1, 2]
+
+
+@pytest.fixture
+def tool_calls(monkeypatch):
+    """
+    Fixture que instala un Router falso con la herramienta "postgres.query".
+
+    Retorna la lista de argumentos con los que se llamó a la herramienta.
+    """
+    calls = []
+
+    async def call_tool(tool_name, arguments):
+        calls.append(arguments)
+        return {"rows": []}
+
+    router = SimpleNamespace(
+        get_tool=lambda tool_name: tool_name == "postgres.query",
+        call_tool=call_tool
+    )
+    monkeypatch.setattr(main, "_router", router)
+    return calls
+
+
+async def test_call_tool_empty_body_means_no_arguments(tool_calls):
+    """
+    Test: Un cuerpo vacío llama a la herramienta con argumentos {}.
+    """
+    response = await main.call_tool("postgres.query", FakeRequest(b""))
+
+    assert response.status_code == 200
+    assert orjson.loads(response.body) == {"tool": "postgres.query", "result": {"rows": []}}
+    assert tool_calls == [{}]
+
+
+async def test_call_tool_rejects_invalid_json(tool_calls):
+    """
+    Test: Un cuerpo que no es JSON produce 400 sin llamar a la herramienta.
+    """
+    response = await main.call_tool("postgres.query", FakeRequest(b"{sql"))
+
+    assert response.status_code == 400
+    assert response.body == main._ERR_INVALID_JSON
+    assert tool_calls == []
+
+
+@pytest.mark.parametrize("body", [b'["SELECT 1"]', b'"SELECT 1"', b"null"])
+async def test_call_tool_rejects_non_object_body(tool_calls, body):
+    """
+    Test: Los argumentos deben ser un objeto JSON.
+    """
+    response = await main.call_tool("postgres.query", FakeRequest(body))
+
+    assert response.status_code == 400
+    assert response.body == main._ERR_INVALID_ARGUMENTS
+    assert tool_calls == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
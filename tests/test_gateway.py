@@ -0,0 +1,535 @@
+"""
+Tests del Gateway WebSocket - Conexiones de MCP Apps
+======================================================
+
+Tests unitarios para el componente MCPAppGateway del MCP Hub.
+
+Autor: Ainsophic Team
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import WebSocketDisconnect
+from mcp.types import CallToolResult, TextContent
+
+from mcp_hub.gateway.websocket import (
+    MCPAppGateway,
+    AppConnection,
+    WebSocketMessage,
+    MessageType,
+    encode_frame,
+)
+
+
+class FakeWebSocket:
+    """
+    WebSocket mínimo que registra los mensajes enviados.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.close_count = 0
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+        self.close_count += 1
+
+
+class ScriptedWebSocket(FakeWebSocket):
+    """
+    WebSocket que entrega una secuencia fija de frames y luego se desconecta.
+    """
+
+    def __init__(self, incoming):
+        super().__init__()
+        self.incoming = list(incoming)
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        if not self.incoming:
+            raise WebSocketDisconnect()
+        return self.incoming.pop(0)
+
+
+@pytest.fixture
+def gateway():
+    """
+    Fixture que retorna un MCPAppGateway con dependencias simuladas.
+    """
+    return MCPAppGateway(
+        orchestrator=MagicMock(),
+        router=MagicMock(),
+        multitenant_manager=MagicMock()
+    )
+
+
+@pytest.fixture
+async def connect(gateway):
+    """
+    Fixture que registra conexiones en el gateway como lo hace handle_websocket.
+
+    Al terminar el test detiene las tareas escritoras de todas las
+    conexiones creadas, para no dejar tareas pendientes en el loop.
+    """
+    connections = []
+
+    def _connect(app_id, tenant_id):
+        connection = AppConnection(
+            connection_id=gateway._generate_connection_id(app_id, tenant_id),
+            app_id=app_id,
+            tenant_id=tenant_id,
+            websocket=FakeWebSocket()
+        )
+        connection.start_writer()
+        gateway.connections[connection.connection_id] = connection
+        gateway._index_connection(connection)
+        connections.append(connection)
+        return connection
+
+    yield _connect
+
+    for connection in connections:
+        await connection.stop_writer()
+
+
+async def test_gateway_connections_by_app_and_tenant(gateway, connect):
+    """
+    Test: Los índices secundarios agrupan conexiones por app y tenant.
+    """
+    conn1 = connect("dashboard", "default")
+    conn2 = connect("dashboard", "production")
+    conn3 = connect("editor", "default")
+
+    def ids(connections):
+        return {conn.connection_id for conn in connections}
+
+    assert ids(gateway.get_connections_by_app("dashboard")) == {
+        conn1.connection_id, conn2.connection_id
+    }
+    assert gateway.get_connections_by_app("editor") == [conn3]
+    assert ids(gateway.get_connections_by_tenant("default")) == {
+        conn1.connection_id, conn3.connection_id
+    }
+    assert gateway.get_connections_by_app("unknown") == []
+
+
+async def test_gateway_status_counts(gateway, connect):
+    """
+    Test: El estado del gateway cuenta conexiones por bucket.
+    """
+    connect("dashboard", "default")
+    connect("dashboard", "production")
+    connect("editor", "default")
+
+    status = gateway.get_gateway_status()
+
+    assert status["total_connections"] == 3
+    assert status["connections_by_tenant"] == {"default": 2, "production": 1}
+    assert status["connections_by_app"] == {"dashboard": 2, "editor": 1}
+
+
+async def test_gateway_cleanup_removes_empty_buckets(gateway, connect):
+    """
+    Test: Limpiar la última conexión de un bucket lo elimina del estado.
+    """
+    conn1 = connect("dashboard", "default")
+    connect("editor", "default")
+
+    await gateway._cleanup_connection(conn1.connection_id)
+
+    status = gateway.get_gateway_status()
+    assert status["total_connections"] == 1
+    assert status["connections_by_tenant"] == {"default": 1}
+    assert status["connections_by_app"] == {"editor": 1}
+    assert gateway.get_connections_by_app("dashboard") == []
+
+
+async def test_gateway_dispatch_ping(gateway, connect):
+    """
+    Test: Un PING se despacha al handler correspondiente y responde PONG.
+    """
+    connection = connect("dashboard", "default")
+
+    await gateway._handle_message(
+        connection,
+        WebSocketMessage(type=MessageType.PING, data={})
+    )
+    await connection.flush()
+
+    assert connection.websocket.sent[-1]["type"] == "pong"
+
+
+async def test_gateway_dispatch_unknown_type(gateway, connect):
+    """
+    Test: Un tipo sin handler registrado responde con un error.
+    """
+    connection = connect("dashboard", "default")
+
+    await gateway._handle_message(
+        connection,
+        WebSocketMessage(type=MessageType.PONG, data={})
+    )
+    await connection.flush()
+
+    sent = connection.websocket.sent[-1]
+    assert sent["type"] == "error"
+    assert "pong" in sent["data"]["error"]
+
+
+async def test_gateway_broadcast_to_tenant(gateway, connect):
+    """
+    Test: Un broadcast llega solo a las conexiones del tenant.
+    """
+    conn1 = connect("dashboard", "default")
+    conn2 = connect("editor", "default")
+    conn3 = connect("dashboard", "production")
+
+    sent = await gateway.broadcast_to_tenant(
+        "default",
+        WebSocketMessage(type=MessageType.SERVER_EVENT, data={"event": "reload"})
+    )
+    await conn1.flush()
+    await conn2.flush()
+
+    assert sent == 2
+    assert conn1.websocket.sent == conn2.websocket.sent
+    assert conn1.websocket.sent[0]["data"] == {"event": "reload"}
+    assert conn3.websocket.sent == []
+
+
+async def test_gateway_tool_call_batch(gateway, connect):
+    """
+    Test: Un lote de llamadas responde un resultado por herramienta.
+    """
+    async def call_tool(tool_name, arguments):
+        if tool_name == "postgres.fail":
+            raise RuntimeError("boom")
+        return {"echo": arguments}
+
+    gateway.router.call_tool = AsyncMock(side_effect=call_tool)
+    connection = connect("dashboard", "default")
+
+    await gateway._handle_message(
+        connection,
+        WebSocketMessage(
+            type=MessageType.TOOL_CALL_BATCH,
+            data={
+                "tool_calls": [
+                    {"tool_name": "postgres.query", "arguments": {"sql": "1"}, "id": "a"},
+                    {"tool_name": "postgres.fail", "id": "b"},
+                ]
+            },
+            message_id="batch-1"
+        )
+    )
+    await connection.flush()
+
+    sent = connection.websocket.sent[-1]
+    assert sent["type"] == "tool_batch_result"
+    assert sent["data"]["correlation_id"] == "batch-1"
+
+    first, second = sent["data"]["results"]
+    assert first == {
+        "tool_name": "postgres.query",
+        "correlation_id": "a",
+        "result": {"echo": {"sql": "1"}}
+    }
+    assert second["correlation_id"] == "b"
+    assert second["error"] == "boom"
+
+
+async def test_gateway_fatal_error_reaches_client(gateway):
+    """
+    Test: Un error fatal del loop de recepción se envía antes de cerrar.
+    """
+    gateway.multitenant_manager.get_tenant_tools.return_value = []
+    gateway.multitenant_manager.get_tenant_status.return_value = {}
+    websocket = ScriptedWebSocket([{"type": "unknown"}])
+
+    await gateway.handle_websocket(websocket, "dashboard", "default")
+
+    frames = []
+    for sent in websocket.sent:
+        frames.extend(sent["data"]["messages"] if sent["type"] == "batch" else [sent])
+
+    assert [frame["type"] for frame in frames] == ["app_state", "error"]
+    assert gateway.connections == {}
+
+
+async def test_connection_drain_skips_stopped_writer():
+    """
+    Test: Drenar una conexión sin tarea escritora no bloquea.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket()
+    )
+    await connection.send_data({"type": "pong"})
+
+    await asyncio.wait_for(connection.drain(timeout=5), timeout=1)
+
+    assert connection.websocket.sent == []
+
+
+async def test_connection_writer_coalesces_pending_frames():
+    """
+    Test: Los frames pendientes se envían agrupados en un frame BATCH.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        batching=True
+    )
+
+    # Encolar antes de arrancar el escritor para que encuentre todo pendiente
+    for index in range(3):
+        await connection.send_data({"type": "server_event", "data": {"n": index}})
+
+    connection.start_writer()
+    await connection.flush()
+    await connection.stop_writer()
+
+    assert len(connection.websocket.sent) == 1
+    batch = connection.websocket.sent[0]
+    assert batch["type"] == "batch"
+    assert [m["data"]["n"] for m in batch["data"]["messages"]] == [0, 1, 2]
+
+
+async def test_connection_writer_sends_frames_separately_by_default():
+    """
+    Test: Sin batching pedido en app_ready, cada frame se envía por separado.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket()
+    )
+
+    for index in range(3):
+        await connection.send_data({"type": "server_event", "data": {"n": index}})
+
+    connection.start_writer()
+    await connection.flush()
+    await connection.stop_writer()
+
+    assert [m["type"] for m in connection.websocket.sent] == ["server_event"] * 3
+
+
+async def test_gateway_app_ready_enables_batching(gateway, connect):
+    """
+    Test: Una App que envía app_ready con batch=true recibe frames BATCH.
+    """
+    gateway.multitenant_manager.get_tenant_tools.return_value = []
+    gateway.multitenant_manager.get_tenant_status.return_value = {}
+    plain = connect("dashboard", "default")
+    batched = connect("dashboard", "default")
+
+    await gateway._handle_message(plain, WebSocketMessage(type=MessageType.APP_READY, data={}))
+    await gateway._handle_message(
+        batched,
+        WebSocketMessage(type=MessageType.APP_READY, data={"batch": True})
+    )
+
+    assert plain.batching is False
+    assert batched.batching is True
+
+
+async def test_connection_writer_coalesces_within_window():
+    """
+    Test: Durante una ráfaga, un frame que llega en la ventana se agrupa.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        batching=True,
+        batch_window=0.05
+    )
+
+    # Un primer envío agrupado marca la ráfaga
+    for index in range(2):
+        await connection.send_data({"type": "server_event", "data": {"n": index}})
+    connection.start_writer()
+    await connection.flush()
+
+    await connection.send_data({"type": "server_event", "data": {"n": 2}})
+    await asyncio.sleep(0)
+    await connection.send_data({"type": "server_event", "data": {"n": 3}})
+    await connection.flush()
+    await connection.stop_writer()
+
+    assert [m["type"] for m in connection.websocket.sent] == ["batch", "batch"]
+    assert [m["data"]["n"] for m in connection.websocket.sent[1]["data"]["messages"]] == [2, 3]
+
+
+async def test_connection_writer_sends_lone_frame_without_window():
+    """
+    Test: Una respuesta aislada no espera la ventana de agrupación.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        batching=True,
+        batch_window=60
+    )
+    connection.start_writer()
+
+    await connection.send_data({"type": "pong"})
+    await asyncio.wait_for(connection.flush(), timeout=1)
+    await connection.stop_writer()
+
+    assert connection.websocket.sent == [{"type": "pong"}]
+
+
+async def test_connection_writer_acks_frame_cancelled_in_window():
+    """
+    Test: Cancelar el escritor durante la ventana no deja frames sin confirmar.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        batching=True,
+        batch_window=60
+    )
+    for index in range(2):
+        await connection.send_data({"type": "server_event", "data": {"n": index}})
+    connection.start_writer()
+    await connection.flush()
+
+    # Tras la ráfaga, el siguiente frame queda esperando la ventana
+    await connection.send_data({"type": "server_event", "data": {"n": 2}})
+    await asyncio.sleep(0)
+    await connection.stop_writer()
+
+    await asyncio.wait_for(connection.flush(), timeout=1)
+    assert len(connection.websocket.sent) == 1
+
+
+async def test_connection_writer_respects_batch_bytes():
+    """
+    Test: Un lote no supera el tamaño máximo configurado.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        batching=True,
+        max_batch_bytes=1
+    )
+
+    for index in range(3):
+        await connection.send_data({"type": "server_event", "data": {"n": index}})
+
+    connection.start_writer()
+    await connection.flush()
+    await connection.stop_writer()
+
+    assert [m["data"]["n"] for m in connection.websocket.sent] == [0, 1, 2]
+
+
+async def test_connection_outbox_overflow_closes():
+    """
+    Test: Una cola de salida llena cierra la conexión en vez de crecer.
+    """
+    connection = AppConnection(
+        connection_id="default:dashboard:1",
+        app_id="dashboard",
+        tenant_id="default",
+        websocket=FakeWebSocket(),
+        outbox_size=2
+    )
+
+    # Sin tarea escritora los mensajes se acumulan en la cola
+    for _ in range(3):
+        await connection.send_data({"type": "pong"})
+
+    assert connection.websocket.closed_with == 1013
+    assert connection.websocket.sent == []
+
+    # Una vez cerrada, los envíos se descartan sin volver a cerrar
+    await connection.send_data({"type": "pong"})
+    assert connection.closed is True
+    assert connection.websocket.close_count == 1
+
+
+async def test_gateway_broadcast_drops_overflowed_connection(gateway, connect):
+    """
+    Test: Una conexión cerrada por cola llena sale del gateway al hacer broadcast.
+    """
+    healthy = connect("dashboard", "default")
+    stalled = connect("editor", "default")
+    await stalled.stop_writer()
+    for _ in range(stalled.outbox_size):
+        await stalled.send_data({"type": "pong"})
+
+    message = WebSocketMessage(type=MessageType.SERVER_EVENT, data={"event": "reload"})
+    await gateway.broadcast_to_tenant("default", message)
+    sent = await gateway.broadcast_to_tenant("default", message)
+    await healthy.flush()
+
+    assert sent == 1
+    assert gateway.get_connections_by_tenant("default") == [healthy]
+    assert stalled.connection_id not in gateway.connections
+    assert stalled.websocket.close_count == 1
+    assert len(healthy.websocket.sent) == 2
+
+
+def test_encode_frame_serializes_sdk_results():
+    """
+    Test: Los resultados del SDK MCP se serializan con sus alias del protocolo.
+    """
+    result = CallToolResult(content=[TextContent(type="text", text="ok")])
+
+    frame = json.loads(encode_frame({"type": "tool_result", "data": {"result": result}}))
+
+    assert frame["data"]["result"]["content"] == [{"type": "text", "text": "ok"}]
+    assert frame["data"]["result"]["isError"] is False
+
+
+def test_message_from_dict():
+    """
+    Test: Decodificar un frame conserva tipo, datos y correlación.
+    """
+    message = WebSocketMessage.from_dict({
+        "type": "tool_call",
+        "data": {"tool_name": "postgres.query"},
+        "timestamp": "2024-01-01T12:00:00",
+        "message_id": "abc"
+    })
+
+    assert message.type is MessageType.TOOL_CALL
+    assert message.data == {"tool_name": "postgres.query"}
+    assert message.timestamp.year == 2024
+    assert message.message_id == "abc"
+
+
+def test_message_from_dict_invalid_type():
+    """
+    Test: Un tipo de mensaje desconocido lanza ValueError.
+    """
+    with pytest.raises(ValueError):
+        WebSocketMessage.from_dict({"type": "unknown"})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -8,11 +8,9 @@ Autor: Ainsophic Team
 """
 
 import pytest
-import tempfile
-import json
-from pathlib import Path
+from datetime import timedelta
 
-from mcp_hub.core.registry import Registry, TenantConfig, ServerConfig
+from mcp_hub.core.registry import TenantConfig, ServerConfig
 from mcp_hub.core.multitenant import (
     MultitenantManager,
     TenantContext,
@@ -21,131 +19,36 @@ from mcp_hub.core.multitenant import (
 )
 
 
-@pytest.fixture
-def sample_config():
-    """
-    Fixture que retorna una configuración de ejemplo.
-    """
-    return {
-        "version": "1.0.0",
-        "tenants": {
-            "default": {
-                "description": "Tenant por defecto",
-                "servers": {
-                    "postgres": {
-                        "name": "postgres",
-                        "type": "database",
-                        "command": "python",
-                        "args": ["-m", "mcp.server.postgres"],
-                        "enabled": True,
-                        "capabilities": ["tools"],
-                        "transport": "stdio",
-                        "metadata": {}
-                    }
-                }
-            },
-            "production": {
-                "description": "Tenant de producción",
-                "servers": {
-                    "postgres-prod": {
-                        "name": "postgres-prod",
-                        "type": "database",
-                        "command": "python",
-                        "args": ["-m", "mcp.server.postgres"],
-                        "enabled": True,
-                        "capabilities": ["tools"],
-                        "transport": "stdio",
-                        "metadata": {}
-                    }
-                }
-            }
-        },
-        "gateway": {
-            "port": 8080,
-            "mcp_port": 8000,
-            "websocket_port": 8081,
-            "host": "0.0.0.0"
-        },
-        "logging": {
-            "level": "INFO",
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        },
-        "orchestrator": {
-            "auto_start": False,
-            "max_retries": 3,
-            "startup_timeout": 30
-        }
-    }
-
-
-@pytest.fixture
-def config_file(sample_config):
-    """
-    Fixture que crea un archivo de configuración temporal.
-    """
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(sample_config, f)
-        config_path = f.name
-    
-    yield config_path
-    
-    # Cleanup
-    Path(config_path).unlink(missing_ok=True)
-
-
-@pytest.fixture
-def registry(config_file):
-    """
-    Fixture que retorna un Registry inicializado.
-    """
-    return Registry.load(config_file)
-
-
-@pytest.fixture
-def mock_orchestrator():
-    """
-    Fixture que crea un mock del Orchestrator.
-    """
-    from unittest.mock import MagicMock
-    
-    orchestrator = MagicMock()
-    orchestrator._parse_server_id = lambda sid: sid.split(":", 1)
-    orchestrator.get_server_client = MagicMock(return_value=None)
-    
-    return orchestrator
-
-
-@pytest.fixture
-def mock_router():
-    """
-    Fixture que crea un mock del Router.
-    """
-    from unittest.mock import MagicMock
-    
-    router = MagicMock()
-    router.clear_tools = MagicMock()
-    router.get_tools_by_server = MagicMock(return_value=[])
-    
-    return router
-
-
-@pytest.fixture
-def multitenant_manager(registry, mock_orchestrator, mock_router):
+@pytest.fixture(scope="module")
+def multitenant_manager(multitenant_registry, mock_orchestrator, mock_router):
     """
     Fixture que retorna un MultitenantManager inicializado.
     """
     return MultitenantManager(
-        registry=registry,
+        registry=multitenant_registry,
         orchestrator=mock_orchestrator,
         router=mock_router
     )
 
 
-def test_tenant_context_creation(multitenant_manager, registry):
+@pytest.fixture(autouse=True)
+def reset_multitenant_state(multitenant_manager):
+    """
+    Fixture que limpia el estado compartido del manager tras cada test.
+    
+    El manager y los stubs se construyen una vez por módulo; aquí se
+    descartan los tenants y cuotas creados por el test.
+    """
+    yield
+    multitenant_manager.tenants.clear()
+    multitenant_manager.quotas.clear()
+
+
+def test_tenant_context_creation(multitenant_manager, multitenant_registry):
     """
     Test: Creación de TenantContext.
     """
-    tenant_config = registry.get_tenant("default")
+    tenant_config = multitenant_registry.get_tenant("default")
     context = TenantContext(
         tenant_id="default",
         config=tenant_config
@@ -157,20 +60,17 @@ def test_tenant_context_creation(multitenant_manager, registry):
     assert not context.is_active()
 
 
-def test_tenant_context_update_activity(multitenant_manager, registry):
+def test_tenant_context_update_activity(multitenant_manager, multitenant_registry):
     """
     Test: Actualizar actividad de tenant.
     """
-    tenant_config = registry.get_tenant("default")
+    tenant_config = multitenant_registry.get_tenant("default")
     context = TenantContext(
         tenant_id="default",
         config=tenant_config
     )
     
-    import time
-    time.sleep(0.1)
-    
-    context.update_activity()
+    context.update_activity(now=context.created_at + timedelta(seconds=1))
     assert context.last_activity > context.created_at
 
 
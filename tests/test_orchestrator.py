@@ -0,0 +1,153 @@
+"""
+Tests del Orchestrator - Arranque y estado de servidores
+==========================================================
+
+Tests unitarios del Orchestrator y del versionado del Router, sin
+procesos MCP reales: los clientes stdio se sustituyen por fakes.
+
+Autor: Ainsophic Team
+"""
+
+import asyncio
+import json
+import pytest
+
+from mcp_hub.core import orchestrator as orchestrator_module
+from mcp_hub.core.orchestrator import Orchestrator, ManagedServer, ServerState
+from mcp_hub.core.registry import Registry
+from mcp_hub.core.router import DynamicToolRouter
+
+
+def test_router_version_bumps_on_catalog_change(sample_config):
+    """
+    Test: Los cambios del catálogo incrementan la versión del Router.
+
+    El listado cacheado de /api/tools depende de esta versión para
+    invalidarse.
+    """
+    registry = Registry.load_from_dict(sample_config)
+    router = DynamicToolRouter(Orchestrator(registry))
+
+    router_version = router.version
+    router.clear_tools()
+    assert router.version == router_version + 1
+
+
+async def test_orchestrator_concurrent_start_spawns_once(sample_config, monkeypatch):
+    """
+    Test: Arranques concurrentes del mismo servidor lanzan un solo cliente.
+    """
+    connects = []
+
+    class FakeClient:
+        def __init__(self, **kwargs):
+            self.is_connected = False
+
+        async def connect(self):
+            connects.append(self)
+            await asyncio.sleep(0.01)
+            self.is_connected = True
+
+        async def initialize(self):
+            pass
+
+    monkeypatch.setattr(orchestrator_module, "StdioClientWrapper", FakeClient)
+
+    orchestrator = Orchestrator(Registry.load_from_dict(sample_config))
+    first, second = await asyncio.gather(
+        orchestrator.start_server("default:postgres"),
+        orchestrator.start_server("default:postgres")
+    )
+
+    assert first is second
+    assert first.is_running()
+    assert len(connects) == 1
+
+
+class RunningClient:
+    """
+    Cliente stdio falso que conecta sin lanzar subprocesos.
+    """
+
+    def __init__(self, **kwargs):
+        self.is_connected = True
+
+    async def connect(self):
+        pass
+
+    async def initialize(self):
+        pass
+
+    async def disconnect(self):
+        raise RuntimeError("desconexión fallida")
+
+
+async def test_orchestrator_status_snapshot_tracks_transitions(sample_config, monkeypatch):
+    """
+    Test: La instantánea de estado refleja las transiciones de servidores.
+    """
+    monkeypatch.setattr(orchestrator_module, "StdioClientWrapper", RunningClient)
+
+    orchestrator = Orchestrator(Registry.load_from_dict(sample_config))
+    empty = orchestrator.status_snapshot
+    assert json.loads(empty) == {"servers": {}, "total": 0}
+    assert orchestrator.status_snapshot is empty
+
+    await orchestrator.start_server("default:postgres")
+
+    snapshot = json.loads(orchestrator.status_snapshot)
+    assert snapshot["total"] == 1
+    assert snapshot["servers"]["default:postgres"]["state"] == "RUNNING"
+
+
+async def test_orchestrator_stop_failure_refreshes_snapshot(sample_config, monkeypatch):
+    """
+    Test: Un fallo al detener un servidor se refleja de inmediato en la instantánea.
+    """
+    monkeypatch.setattr(orchestrator_module, "StdioClientWrapper", RunningClient)
+
+    orchestrator = Orchestrator(Registry.load_from_dict(sample_config))
+    events = []
+
+    def observer(event, data):
+        events.append(event)
+        # Una consulta durante la parada deja la instantánea al día en STOPPING
+        orchestrator.status_snapshot
+
+    orchestrator.add_observer(observer)
+    await orchestrator.start_server("default:postgres")
+
+    await orchestrator.stop_server("default:postgres")
+
+    server = json.loads(orchestrator.status_snapshot)["servers"]["default:postgres"]
+    assert server["state"] == "CRASHED"
+    assert server["last_error"] == "desconexión fallida"
+    assert events[-1] == "server_stop_failed"
+
+
+def test_orchestrator_server_status_bytes_cached(sample_config):
+    """
+    Test: El estado serializado se reutiliza hasta que cambia el servidor.
+    """
+    registry = Registry.load_from_dict(sample_config)
+    orchestrator = Orchestrator(registry)
+    assert orchestrator.get_server_status_bytes("default:postgres") is None
+
+    managed = ManagedServer(
+        server_id="default:postgres",
+        tenant_id="default",
+        config=registry.get_server_config("default", "postgres"),
+        state=ServerState.RUNNING
+    )
+    orchestrator.managed_servers[managed.server_id] = managed
+
+    first = orchestrator.get_server_status_bytes(managed.server_id)
+    assert orchestrator.get_server_status_bytes(managed.server_id) is first
+    assert json.loads(first)["state"] == "RUNNING"
+
+    managed.state = ServerState.CRASHED
+    assert json.loads(orchestrator.get_server_status_bytes(managed.server_id))["state"] == "CRASHED"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -9,7 +9,7 @@ Autor: Ainsophic Team
 
 import pytest
 import json
-import tempfile
+from dataclasses import FrozenInstanceError
 from pathlib import Path
 
 from mcp_hub.core.registry import (
@@ -22,62 +22,13 @@ from mcp_hub.core.registry import (
 
 
 @pytest.fixture
-def sample_config():
-    """
-    Fixture que retorna una configuración de ejemplo.
-    """
-    return {
-        "version": "1.0.0",
-        "tenants": {
-            "default": {
-                "description": "Tenant por defecto",
-                "servers": {
-                    "postgres": {
-                        "name": "postgres",
-                        "type": "database",
-                        "command": "python",
-                        "args": ["-m", "mcp.server.postgres"],
-                        "enabled": True,
-                        "capabilities": ["tools", "resources"],
-                        "transport": "stdio",
-                        "metadata": {
-                            "description": "Servidor PostgreSQL"
-                        }
-                    }
-                }
-            }
-        },
-        "gateway": {
-            "port": 8080,
-            "mcp_port": 8000,
-            "websocket_port": 8081,
-            "host": "0.0.0.0"
-        },
-        "logging": {
-            "level": "INFO",
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        },
-        "orchestrator": {
-            "auto_start": False,
-            "max_retries": 3,
-            "startup_timeout": 30
-        }
-    }
-
-
-@pytest.fixture
-def config_file(sample_config):
+def writable_config_file(config_file, tmp_path):
     """
-    Fixture que crea un archivo de configuración temporal.
+    Fixture que retorna una copia modificable del archivo de configuración.
     """
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(sample_config, f)
-        config_path = f.name
-    
-    yield config_path
-    
-    # Cleanup
-    Path(config_path).unlink(missing_ok=True)
+    config_path = tmp_path / "servers.json"
+    config_path.write_bytes(Path(config_file).read_bytes())
+    return str(config_path)
 
 
 def test_server_config_creation():
@@ -99,6 +50,39 @@ def test_server_config_creation():
     assert config.get_full_command() == ["python", "-m", "mcp.server.postgres"]
 
 
+def test_server_config_is_frozen():
+    """
+    Test: La configuración de un servidor es inmutable.
+    """
+    config = ServerConfig(name="postgres", type="database", command="python")
+    
+    with pytest.raises(FrozenInstanceError):
+        config.enabled = False
+
+
+def test_configs_are_hashable(registry):
+    """
+    Test: Las configuraciones inmutables se pueden usar en sets y como llaves.
+    
+    Los diccionarios de metadatos y servidores no entran en el hash.
+    """
+    server = registry.get_server_config("default", "postgres")
+    tenant = registry.get_tenant("default")
+    twin = ServerConfig(
+        name=server.name,
+        type=server.type,
+        command=server.command,
+        args=server.args,
+        capabilities=server.capabilities,
+        metadata=dict(server.metadata)
+    )
+    
+    assert server.metadata
+    assert hash(twin) == hash(server)
+    assert {server, twin} == {server}
+    assert {tenant: "default"}[tenant] == "default"
+
+
 def test_tenant_config_creation():
     """
     Test: Creación de TenantConfig.
@@ -153,6 +137,7 @@ def test_tenant_config_get_enabled_servers():
     enabled = tenant.get_enabled_servers()
     assert len(enabled) == 1
     assert enabled[0].name == "postgres"
+    assert tenant.get_enabled_servers() is enabled
 
 
 def test_registry_load_config(config_file, sample_config):
@@ -166,11 +151,10 @@ def test_registry_load_config(config_file, sample_config):
     assert len(registry.tenants) == 1
 
 
-def test_registry_load_tenant_config(config_file):
+def test_registry_load_tenant_config(registry):
     """
     Test: Cargar configuración de tenant correctamente.
     """
-    registry = Registry.load(config_file)
     tenant = registry.get_tenant("default")
     
     assert tenant is not None
@@ -179,11 +163,10 @@ def test_registry_load_tenant_config(config_file):
     assert tenant.servers["postgres"].type == "database"
 
 
-def test_registry_load_gateway_config(config_file):
+def test_registry_load_gateway_config(registry):
     """
     Test: Cargar configuración del gateway correctamente.
     """
-    registry = Registry.load(config_file)
     
     assert registry.gateway.port == 8080
     assert registry.gateway.mcp_port == 8000
@@ -191,43 +174,39 @@ def test_registry_load_gateway_config(config_file):
     assert registry.gateway.host == "0.0.0.0"
 
 
-def test_registry_load_orchestrator_config(config_file):
+def test_registry_load_orchestrator_config(registry):
     """
     Test: Cargar configuración del orchestrator correctamente.
     """
-    registry = Registry.load(config_file)
     
     assert registry.orchestrator.auto_start is False
     assert registry.orchestrator.max_retries == 3
     assert registry.orchestrator.startup_timeout == 30
 
 
-def test_registry_get_nonexistent_tenant(config_file):
+def test_registry_get_nonexistent_tenant(registry):
     """
     Test: Obtener tenant que no existe retorna None.
     """
-    registry = Registry.load(config_file)
     tenant = registry.get_tenant("nonexistent")
     
     assert tenant is None
 
 
-def test_registry_get_all_tenants(config_file):
+def test_registry_get_all_tenants(registry):
     """
     Test: Obtener lista de todos los tenants.
     """
-    registry = Registry.load(config_file)
     tenants = registry.get_all_tenants()
     
     assert len(tenants) == 1
     assert "default" in tenants
 
 
-def test_registry_get_server_config(config_file):
+def test_registry_get_server_config(registry):
     """
     Test: Obtener configuración de servidor específico.
     """
-    registry = Registry.load(config_file)
     server = registry.get_server_config("default", "postgres")
     
     assert server is not None
@@ -235,11 +214,10 @@ def test_registry_get_server_config(config_file):
     assert server.type == "database"
 
 
-def test_registry_get_all_servers(config_file):
+def test_registry_get_all_servers(registry):
     """
     Test: Obtener todos los servidores con sus IDs.
     """
-    registry = Registry.load(config_file)
     servers = registry.get_all_servers()
     
     assert len(servers) == 1
@@ -247,6 +225,36 @@ def test_registry_get_all_servers(config_file):
     assert servers["default:postgres"].name == "postgres"
 
 
+def test_registry_load_from_dict(sample_config):
+    """
+    Test: Cargar configuración desde un diccionario en memoria.
+    """
+    registry = Registry.load_from_dict(sample_config)
+    
+    assert registry.version == sample_config["version"]
+    assert registry.get_server_config("default", "postgres").args == ("-m", "mcp.server.postgres")
+    
+    # Sin archivo asociado no hay nada que recargar
+    with pytest.raises(RuntimeError):
+        registry.reload()
+
+
+def test_registry_load_reuses_parsed_file(config_file):
+    """
+    Test: Cargar el mismo archivo dos veces no lo vuelve a parsear.
+    """
+    first = Registry.load(config_file)
+    first.tenants["default"].servers["postgres"].metadata["description"] = "modificado"
+    
+    hits = Registry._load_cached.cache_info().hits
+    second = Registry.load(config_file)
+    
+    assert Registry._load_cached.cache_info().hits == hits + 1
+    assert second.tenants["default"].servers["postgres"].metadata == {
+        "description": "Servidor PostgreSQL"
+    }
+
+
 def test_registry_nonexistent_config_file():
     """
     Test: Intentar cargar archivo inexistente lanza excepción.
@@ -270,8 +278,9 @@ def test_registry_singleton(config_file):
     """
     Test: Registry implementa patrón Singleton.
     """
-    registry1 = Registry.load(config_file)
-    registry2 = Registry.get_instance()
+    with Registry.isolated():
+        registry1 = Registry.load(config_file)
+        registry2 = Registry.get_instance()
     
     assert registry1 is registry2
 
@@ -280,20 +289,32 @@ def test_registry_get_instance_without_load():
     """
     Test: Obtener instancia sin cargar lanza excepción.
     """
-    Registry._instance = None  # Reset singleton
+    with Registry.isolated():
+        with pytest.raises(RuntimeError):
+            Registry.get_instance()
+
+
+def test_registry_isolated_restores_instance(config_file):
+    """
+    Test: Registry.isolated() restaura la instancia previa al salir.
+    """
+    registry = Registry.load(config_file)
     
-    with pytest.raises(RuntimeError):
-        Registry.get_instance()
+    with Registry.isolated():
+        with pytest.raises(RuntimeError):
+            Registry.get_instance()
+    
+    assert Registry.get_instance() is registry
 
 
-def test_registry_reload(config_file):
+def test_registry_reload(writable_config_file):
     """
     Test: Recargar configuración desde archivo.
     """
-    registry = Registry.load(config_file)
+    registry = Registry.load(writable_config_file)
     
     # Modificar archivo
-    with open(config_file, 'r+') as f:
+    with open(writable_config_file, 'r+') as f:
         config = json.load(f)
         config["version"] = "2.0.0"
         f.seek(0)
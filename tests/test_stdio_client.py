@@ -0,0 +1,212 @@
+"""
+Tests del Cliente Stdio - Ciclo de vida de la sesión MCP
+==========================================================
+
+Tests unitarios de StdioClientWrapper con sesiones MCP simuladas.
+
+Autor: Ainsophic Team
+"""
+
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from mcp.types import (
+    Implementation,
+    InitializeResult,
+    ListToolsResult,
+    ServerCapabilities,
+    Tool,
+    ToolsCapability,
+)
+
+from mcp_hub.transport import stdio_client as stdio_module
+from mcp_hub.transport.stdio_client import (
+    MCPConnectionError,
+    MCPToolCallError,
+    StdioClientWrapper,
+    ToolInfo,
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    Fixture que retorna un wrapper cuya conexión no lanza subprocesos.
+
+    connect() solo marca la sesión como abierta; initialize() falla
+    para simular un handshake MCP fallido.
+    """
+    client = StdioClientWrapper(command="python", args=[])
+
+    async def connect():
+        client._connected = True
+        return client
+
+    async def initialize():
+        raise RuntimeError("handshake fallido")
+
+    monkeypatch.setattr(client, "connect", connect)
+    monkeypatch.setattr(client, "initialize", initialize)
+    return client
+
+
+async def test_context_closes_session_when_initialize_fails(client):
+    """
+    Test: Si el handshake falla, el contexto cierra la sesión que abrió.
+    """
+    with pytest.raises(RuntimeError):
+        async with client:
+            pass
+
+    assert not client.is_connected
+    assert client._context_depth == 0
+    assert client._context_owns_session is False
+
+
+async def test_context_keeps_foreign_session_when_initialize_fails(client):
+    """
+    Test: Una sesión abierta fuera del contexto no se cierra si el handshake falla.
+    """
+    await client.connect()
+
+    with pytest.raises(RuntimeError):
+        async with client:
+            pass
+
+    assert client.is_connected
+    assert client._context_depth == 0
+
+
+async def test_call_tool_retry_backoff_is_jittered_and_capped(monkeypatch):
+    """
+    Test: Los reintentos esperan un backoff con jitter, acotado por el cap.
+
+    Tras el último intento no se espera: el timeout se propaga.
+    """
+    client = StdioClientWrapper(command="python", args=[], max_retries=7)
+    client._initialized = True
+    client._server_info = SimpleNamespace(tools={"query": ToolInfo(name="query")})
+
+    async def call_tool(tool_name, arguments):
+        raise asyncio.TimeoutError()
+
+    client._session = SimpleNamespace(call_tool=call_tool)
+
+    bounds = []
+    delays = []
+
+    def uniform(low, high):
+        bounds.append((low, high))
+        return high
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(stdio_module.random, "uniform", uniform)
+    monkeypatch.setattr(stdio_module.asyncio, "sleep", sleep)
+
+    with pytest.raises(MCPToolCallError):
+        await client.call_tool("query", {})
+
+    base = stdio_module.RETRY_BACKOFF_BASE
+    assert bounds == [(0, base * 2 ** attempt) for attempt in range(6)]
+    assert delays == [
+        min(stdio_module.RETRY_BACKOFF_CAP, base * 2 ** attempt) for attempt in range(6)
+    ]
+    assert max(delays) == stdio_module.RETRY_BACKOFF_CAP
+
+
+class HandshakeSession:
+    """
+    Sesión MCP falsa que responde el handshake y el listado de herramientas.
+    """
+
+    def __init__(self, init_result, tools_result):
+        self.init_result = init_result
+        self.tools_result = tools_result
+
+    async def initialize(self):
+        return self.init_result
+
+    async def list_tools(self):
+        return self.tools_result
+
+
+@pytest.mark.parametrize("init_result, tools_result", [
+    (
+        InitializeResult(
+            protocolVersion="2024-11-05",
+            capabilities=ServerCapabilities(tools=ToolsCapability()),
+            serverInfo=Implementation(name="postgres", version="1.2.0")
+        ),
+        ListToolsResult(tools=[Tool(name="query", inputSchema={"type": "object"})])
+    ),
+    (
+        {
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "postgres", "version": "1.2.0"}
+        },
+        SimpleNamespace(tools=[
+            SimpleNamespace(name="query", description=None, inputSchema={"type": "object"})
+        ])
+    ),
+], ids=["model", "dict"])
+async def test_initialize_parses_handshake(init_result, tools_result):
+    """
+    Test: El handshake se interpreta igual con modelos del SDK y con diccionarios.
+    """
+    client = StdioClientWrapper(command="python", args=[])
+    client._connected = True
+    client._session = HandshakeSession(init_result, tools_result)
+
+    info = await client.initialize()
+
+    assert info.name == "postgres"
+    assert info.version == "1.2.0"
+    assert info.caps.has_tools is True
+    assert info.caps.has_resources is False
+    assert "tools" in info.capabilities
+    assert info.tools["query"].input_schema == {"type": "object"}
+
+
+async def test_connect_closes_stdio_when_session_fails(monkeypatch):
+    """
+    Test: Si la sesión MCP no se puede abrir, el contexto stdio se cierra.
+    """
+    stdio_events = []
+
+    @asynccontextmanager
+    async def stdio_client(server_params):
+        stdio_events.append("enter")
+        try:
+            yield "read", "write"
+        finally:
+            stdio_events.append("exit")
+
+    class FailingSession:
+        def __init__(self, read_stream, write_stream):
+            pass
+
+        async def __aenter__(self):
+            raise RuntimeError("sesión rechazada")
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return False
+
+    monkeypatch.setattr(stdio_module, "stdio_client", stdio_client)
+    monkeypatch.setattr(stdio_module, "ClientSession", FailingSession)
+    client = StdioClientWrapper(command="python", args=[])
+
+    with pytest.raises(MCPConnectionError):
+        await client.connect()
+
+    assert stdio_events == ["enter", "exit"]
+    assert not client.is_connected
+    assert client._session is None
+    assert client._exit_stack is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
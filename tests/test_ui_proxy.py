@@ -0,0 +1,60 @@
+"""
+Tests del UI Proxy - Recursos de MCP Apps
+===========================================
+
+Tests unitarios para el servicio del index.html de las MCP Apps.
+
+Autor: Ainsophic Team
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from mcp_hub.gateway.ui_proxy import UIProxy
+
+
+INDEX_HTML = "<html><body><script>window.__MCP_CONFIG__ = {};</script></body></html>"
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    """
+    Fixture que retorna un UIProxy con una app "dashboard" instalada.
+    """
+    ui_dir = tmp_path / "dashboard" / "ui"
+    ui_dir.mkdir(parents=True)
+    (ui_dir / "index.html").write_text(INDEX_HTML)
+    return UIProxy(plugins_dir=str(tmp_path))
+
+
+async def test_app_index_caches_one_template_per_app(proxy):
+    """
+    Test: Los tenants de la query string no crean entradas de caché nuevas.
+    """
+    responses = [
+        await proxy.serve_app_index("dashboard", tenant_id=f"tenant-{index}")
+        for index in range(5)
+    ]
+
+    assert proxy.get_cache_stats()["entries"] == 1
+    assert b'"tenantId": "tenant-3"' in responses[3].body
+    assert len({response.headers["etag"] for response in responses}) == 5
+
+
+async def test_app_index_not_modified_per_tenant(proxy):
+    """
+    Test: El ETag de un tenant produce 304 solo para ese tenant.
+    """
+    first = await proxy.serve_app_index("dashboard", tenant_id="default")
+    request = SimpleNamespace(headers={"if-none-match": first.headers["etag"]})
+
+    cached = await proxy.serve_app_index("dashboard", tenant_id="default", request=request)
+    other = await proxy.serve_app_index("dashboard", tenant_id="production", request=request)
+
+    assert cached.status_code == 304
+    assert other.status_code == 200
+    assert b'"tenantId": "production"' in other.body
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])